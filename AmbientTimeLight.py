@@ -1,52 +1,57 @@
-from machine import Pin, PWM
+from machine import Timer
+import machine
 import time
+import led_rgb
+from micropython import const
 
-pwm_red = PWM(Pin(16))
-pwm_green = PWM(Pin(17))
-pwm_blue = PWM(Pin(18))
+# Set True to log every hourly check over serial
+_DEBUG = const(False)
 
-pwm_red.freq(1000)
-pwm_green.freq(1000)
-pwm_blue.freq(1000)
+# RGB LED on pins 16-18; the higher the value, the brighter the color.
+set_color = led_rgb.init((16, 17, 18), common_anode=False)
 
-def set_color(r, g, b):
-    # We need to map the 0-255 values to the 16-bit PWM duty cycle range (0-65535)
-    # The higher the value, the brighter the color.
-    pwm_red.duty_u16(int((r / 255) * 65535))
-    pwm_green.duty_u16(int((g / 255) * 65535))
-    pwm_blue.duty_u16(int((b / 255) * 65535))
+# --- Time of Day Table ---
+# Colors for each part of the day, and which one each hour (0-23) uses.
+PALETTE = (
+    (255, 140, 0),   # 0: Morning / Sunrise (orange-red)
+    (200, 220, 255), # 1: Daytime (cool blue-white)
+    (255, 105, 180), # 2: Evening / Sunset (purple-pink)
+    (0, 0, 128),     # 3: Night (deep blue)
+)
+PALETTE_NAMES = ("Sunrise", "Daylight", "Sunset", "Night")
 
-print("Starting time-based color sequence...")
+#                    0-5      6-8      9-17     18-20    21-23
+HOUR_BUCKET = bytes([3] * 6 + [0] * 3 + [1] * 9 + [2] * 3 + [3] * 3)
 
-while True:
-    # Get the current time as a tuple
-    current_time = time.localtime()
+last_bucket = -1 # Nothing set yet
+
+def update_ambient(timer=None):
+    """Timer callback: picks the color for the current hour."""
+    global last_bucket
 
     # Get the current hour (0-23)
-    current_hour = current_time[3]
-    print(f"Current hour: {current_hour}")
-
-    # Set the color based on the time of day
-    if 6 <= current_hour < 9:
-        # Morning / Sunrise (orange-red)
-        # R: 255, G: 140, B: 0
-        set_color(255, 140, 0)
-        print("Sunrise colors...")
-    elif 9 <= current_hour < 18:
-        # Daytime (cool blue-white)
-        # R: 200, G: 220, B: 255
-        set_color(200, 220, 255)
-        print("Daylight colors...")
-    elif 18 <= current_hour < 21:
-        # Evening / Sunset (purple-pink)
-        # R: 255, G: 105, B: 180
-        set_color(255, 105, 180)
-        print("Sunset colors...")
-    else:
-        # Night (deep blue)
-        # R: 0, G: 0, B: 128
-        set_color(0, 0, 128)
-        print("Night colors...")
-
-    # Wait for one minute before checking the time and updating the color again
-    time.sleep(60)
+    current_hour = time.localtime()[3]
+    if _DEBUG:
+        print("Current hour:", current_hour)
+
+    # Only touch the LED when the hour moves into a new part of the day
+    bucket = HOUR_BUCKET[current_hour]
+    if bucket == last_bucket:
+        return
+    last_bucket = bucket
+
+    set_color(*PALETTE[bucket])
+    if _DEBUG:
+        print(PALETTE_NAMES[bucket], "colors...")
+
+print("Starting time-based color sequence...")
+
+# Set the color now, then re-check once a minute from a hardware timer
+update_ambient()
+ambient_timer = Timer()
+ambient_timer.init(period=60_000, mode=Timer.PERIODIC, callback=update_ambient)
+
+# The CPU is free between ticks; idle() waits for the next interrupt while
+# keeping the PWM clocks running (lightsleep would stop the LED output).
+while True:
+    machine.idle()
@@ -1,5 +1,7 @@
 import utime
-from machine import Pin, PWM
+import array
+import micropython
+import led_rgb
 
 # --- SETUP ---
 # Adjust these pin numbers to match your RGB LED's connections.
@@ -8,56 +10,107 @@ PIN_R = 16
 PIN_G = 17
 PIN_B = 18
 
-led_r = PWM(Pin(PIN_R))
-led_g = PWM(Pin(PIN_G))
-led_b = PWM(Pin(PIN_B))
+PINS = (PIN_R, PIN_G, PIN_B)
 
 # Set the PWM frequency
 PWM_FREQ = 1000
-led_r.freq(PWM_FREQ)
-led_g.freq(PWM_FREQ)
-led_b.freq(PWM_FREQ)
-
-# Helper function to set the LED color
-def set_rgb(r, g, b):
-    # Clamp values to the 0-255 range
-    r = max(0, min(255, int(r)))
-    g = max(0, min(255, int(g)))
-    b = max(0, min(255, int(b)))
-    
-    # Set the PWM duty cycle (0-65535)
-    led_r.duty_u16(int(r / 255 * 65535))
-    led_g.duty_u16(int(g / 255 * 65535))
-    led_b.duty_u16(int(b / 255 * 65535))
+
+# Helper function to set the LED color (0-255, clamped)
+set_rgb = led_rgb.init(PINS, common_anode=False, freq=PWM_FREQ)
+
+# Raw channels and duty table, for replaying precomputed ramps
+led_r, led_g, led_b = led_rgb.channels(PINS, PWM_FREQ)
+DUTY_LUT = led_rgb.duty_lut(common_anode=False)
 
 # --- COLOR SPACE CONVERSIONS (YUV) ---
 # The YUV formulas are based on the BT.601 standard for standard definition video.
 # Y = Luma (brightness), U = Chrominance (Blue - Luma), V = Chrominance (Red - Luma)
-
+#
+# The matrices are stored as Q16 fixed-point integers (coefficient * 65536) so the
+# conversions run entirely on the integer ALU. Y is 0-255; U and V are signed
+# integers on the same 0-255 scale (roughly -111..111 and -157..157).
+
+# RGB -> YUV
+C_YR = 19595    # 0.299
+C_YG = 38470    # 0.587
+C_YB = 7471     # 0.114
+C_UR = -9634    # -0.147
+C_UG = -18940   # -0.289
+C_UB = 28574    # 0.436
+C_VR = 40305    # 0.615
+C_VG = -33751   # -0.515
+C_VB = -6554    # -0.100
+
+# YUV -> RGB
+C_RV = 74711    # 1.140
+C_GU = -25887   # -0.395
+C_GV = -38076   # -0.581
+C_BU = 133169   # 2.032
+
+@micropython.native
 def rgb_to_yuv(r, g, b):
-    """Converts 8-bit RGB to normalized YUV."""
-    r_norm = r / 255.0
-    g_norm = g / 255.0
-    b_norm = b / 255.0
-
-    y = 0.299 * r_norm + 0.587 * g_norm + 0.114 * b_norm
-    u = -0.147 * r_norm - 0.289 * g_norm + 0.436 * b_norm
-    v = 0.615 * r_norm - 0.515 * g_norm - 0.100 * b_norm
+    """Converts 8-bit RGB to integer YUV (Y 0-255, signed U/V)."""
+    y = (C_YR * r + C_YG * g + C_YB * b) >> 16
+    u = (C_UR * r + C_UG * g + C_UB * b) >> 16
+    v = (C_VR * r + C_VG * g + C_VB * b) >> 16
 
     return y, u, v
 
+@micropython.native
 def yuv_to_rgb(y, u, v):
-    """Converts normalized YUV to 8-bit RGB."""
-    r_norm = y + 1.140 * v
-    g_norm = y - 0.395 * u - 0.581 * v
-    b_norm = y + 2.032 * u
-
-    r = int(r_norm * 255)
-    g = int(g_norm * 255)
-    b = int(b_norm * 255)
+    """Converts integer YUV back to 8-bit RGB (unclamped)."""
+    r = y + ((C_RV * v) >> 16)
+    g = y + ((C_GU * u + C_GV * v) >> 16)
+    b = y + ((C_BU * u) >> 16)
 
     return (r, g, b)
 
+# --- PRECOMPUTED RAMPS ---
+# A fade for a fixed target color is deterministic, so each one is computed once
+# into a flat array('H') of duty triples (101 steps * 3 channels) and replayed.
+
+RAMP_STEPS = 101
+ramp_cache = {}  # (effect, target_rgb) -> array('H')
+
+def rgb_to_duty(c):
+    """Clamps one 8-bit channel and returns its PWM duty."""
+    c = int(c)
+    return DUTY_LUT[0 if c < 0 else 255 if c > 255 else c]
+
+def build_ramp(effect, target_rgb):
+    """
+    Returns the cached duty ramp for an effect. Step i is the color at i% of
+    the effect's parameter (Luma for 'luma', chrominance for 'chroma').
+    """
+    key = (effect, target_rgb)
+    ramp = ramp_cache.get(key)
+    if ramp is not None:
+        return ramp
+
+    y_base, u_base, v_base = rgb_to_yuv(*target_rgb)
+    ramp = array.array('H', [0] * (RAMP_STEPS * 3))
+    for i in range(RAMP_STEPS):
+        if effect == 'luma':
+            r, g, b = yuv_to_rgb(i * 255 // 100, u_base, v_base)
+        else:
+            r, g, b = yuv_to_rgb(y_base, u_base * i // 100, v_base * i // 100)
+        j = i * 3
+        ramp[j] = rgb_to_duty(r)
+        ramp[j + 1] = rgb_to_duty(g)
+        ramp[j + 2] = rgb_to_duty(b)
+
+    ramp_cache[key] = ramp
+    return ramp
+
+def play_ramp(ramp, steps, delay_ms=10):
+    """Writes the ramp entries for each step index straight to the PWM channels."""
+    for i in steps:
+        j = i * 3
+        led_r.duty_u16(ramp[j])
+        led_g.duty_u16(ramp[j + 1])
+        led_b.duty_u16(ramp[j + 2])
+        utime.sleep_ms(delay_ms)
+
 # --- EFFECT FUNCTIONS ---
 
 def luma_fade_effect(target_rgb=(255, 105, 180)):
@@ -67,22 +120,13 @@ def luma_fade_effect(target_rgb=(255, 105, 180)):
     """
     print("Running Luma Fade Effect...")
     
-    # Convert the target RGB color to YUV
-    y_base, u_base, v_base = rgb_to_yuv(*target_rgb)
+    ramp = build_ramp('luma', target_rgb)
     
-    # Fade in
-    for i in range(101):
-        y_current = i / 100.0  # Luma from 0 (black) to 1 (full brightness)
-        r, g, b = yuv_to_rgb(y_current, u_base, v_base)
-        set_rgb(r, g, b)
-        utime.sleep_ms(10)
+    # Fade in (Luma from 0 (black) to 255 (full brightness))
+    play_ramp(ramp, range(RAMP_STEPS))
     
     # Fade out
-    for i in range(100, -1, -1):
-        y_current = i / 100.0
-        r, g, b = yuv_to_rgb(y_current, u_base, v_base)
-        set_rgb(r, g, b)
-        utime.sleep_ms(10)
+    play_ramp(ramp, range(RAMP_STEPS - 1, -1, -1))
 
 def chrominance_desaturation_effect(target_rgb=(0, 255, 255)):
     """
@@ -91,25 +135,13 @@ def chrominance_desaturation_effect(target_rgb=(0, 255, 255)):
     """
     print("Running Chrominance Desaturation Effect...")
 
-    y_base, u_base, v_base = rgb_to_yuv(*target_rgb)
+    ramp = build_ramp('chroma', target_rgb)
 
     # Transition from full color to grayscale
-    for i in range(101):
-        scale = 1 - (i / 100.0) # Scale from 1 to 0
-        u_current = u_base * scale
-        v_current = v_base * scale
-        r, g, b = yuv_to_rgb(y_base, u_current, v_current)
-        set_rgb(r, g, b)
-        utime.sleep_ms(10)
+    play_ramp(ramp, range(RAMP_STEPS - 1, -1, -1))
 
     # Transition from grayscale back to full color
-    for i in range(101):
-        scale = i / 100.0
-        u_current = u_base * scale
-        v_current = v_base * scale
-        r, g, b = yuv_to_rgb(y_base, u_current, v_current)
-        set_rgb(r, g, b)
-        utime.sleep_ms(10)
+    play_ramp(ramp, range(RAMP_STEPS))
 
 def grayscale_cycle_effect():
     """
@@ -6,7 +6,10 @@
 import utime
 import math
 import random
-from machine import Pin, PWM
+import array
+import micropython
+from micropython import const
+import led_rgb
 
 # --- Configuration ---
 COMMON_ANODE = True 
@@ -14,33 +17,77 @@ JOY_EXIT_THRESHOLD = 20000
 LED_PINS = [16, 17, 18] # R, G, B
 
 # --- Hardware Init ---
-pwm_r = PWM(Pin(LED_PINS[0]))
-pwm_g = PWM(Pin(LED_PINS[1]))
-pwm_b = PWM(Pin(LED_PINS[2]))
-for pwm in [pwm_r, pwm_g, pwm_b]:
-    pwm.freq(1000)
-
-def set_rgb(r, g, b):
-    # Clamp 0-255
-    r = int(max(0, min(255, r)))
-    g = int(max(0, min(255, g)))
-    b = int(max(0, min(255, b)))
+set_rgb = led_rgb.init(LED_PINS, COMMON_ANODE)
+
+# --- Fixed-Point Kernel ---
+# Populations and rates are Q15 integers (1.0 == Q_ONE). Q15 keeps every
+# product (at most 1.0 * 1.0) inside a signed 32-bit viper int.
+Q_ONE = const(32768)
+
+def to_q(x):
+    return int(x * Q_ONE)
+
+@micropython.viper
+def bio_step(state, params, out):
+    """
+    One Euler step of the cyclic Lotka-Volterra model, in place.
+    state  = array('i', [r, g, b])
+    params = array('i', [rate_rg, rate_gb, rate_br, growth - decay])
+    out    = array('B', [r, g, b]) receives the new state as 0-255
+    """
+    s = ptr32(state)
+    p = ptr32(params)
+    o = ptr8(out)
+    r = s[0]
+    g = s[1]
+    b = s[2]
+    rg = p[0]
+    gb = p[1]
+    br = p[2]
+    net = p[3]
+    
+    dr = ((r * net) >> 15) + ((((r * g) >> 15) * rg) >> 15) - ((((r * b) >> 15) * br) >> 15)
+    dg = ((g * net) >> 15) + ((((g * b) >> 15) * gb) >> 15) - ((((g * r) >> 15) * rg) >> 15)
+    db = ((b * net) >> 15) + ((((b * r) >> 15) * br) >> 15) - ((((b * g) >> 15) * gb) >> 15)
     
-    if COMMON_ANODE:
-        pwm_r.duty_u16(65535 - (r * 257))
-        pwm_g.duty_u16(65535 - (g * 257))
-        pwm_b.duty_u16(65535 - (b * 257))
-    else:
-        pwm_r.duty_u16(r * 257)
-        pwm_g.duty_u16(g * 257)
-        pwm_b.duty_u16(b * 257)
+    r += dr
+    g += dg
+    b += db
+    
+    # Clamp to 0 - Q_ONE
+    if r < 0: r = 0
+    if r > 32768: r = 32768
+    if g < 0: g = 0
+    if g > 32768: g = 32768
+    if b < 0: b = 0
+    if b > 32768: b = 32768
+    
+    s[0] = r
+    s[1] = g
+    s[2] = b
+    
+    # Map Q15 (0-32768) to 0-255
+    o[0] = (r * 255) >> 15
+    o[1] = (g * 255) >> 15
+    o[2] = (b * 255) >> 15
+
+@micropython.native
+def fill_trajectory(state, params, out, buf, steps):
+    """Runs bio_step `steps` times, storing each color as a triple in buf."""
+    j = 0
+    for _ in range(steps):
+        bio_step(state, params, out)
+        buf[j] = out[0]
+        buf[j + 1] = out[1]
+        buf[j + 2] = out[2]
+        j += 3
 
 class BioSystem:
     def __init__(self):
-        # Initial Population (0.0 to 1.0)
-        self.r = 0.5
-        self.g = 0.5
-        self.b = 0.5
+        # Initial Population (0.0 to 1.0, stored as Q15)
+        self.state = array.array('i', [to_q(0.5), to_q(0.5), to_q(0.5)])
+        # Display color (0-255), reused every update
+        self.out = array.array('B', [0, 0, 0])
         
         # The "DNA" - Reaction Rates
         # How fast does R eat G? etc.
@@ -54,6 +101,18 @@ class BioSystem:
         self.growth = 0.02
         
         self.generation_count = 0
+        
+        # Q15 copy of the rates handed to the kernel
+        self.params = array.array('i', [0, 0, 0, 0])
+        self.load_params()
+
+    def load_params(self):
+        """Copies the float "DNA" into the kernel's fixed-point params."""
+        p = self.params
+        p[0] = to_q(self.rate_rg)
+        p[1] = to_q(self.rate_gb)
+        p[2] = to_q(self.rate_br)
+        p[3] = to_q(self.growth - self.decay)
 
     def mutate(self):
         """Randomizes the reaction rates to change the balance of power."""
@@ -68,10 +127,15 @@ class BioSystem:
         if random.random() > 0.8:
             self.growth = random.uniform(0.01, 0.04)
         
+        self.load_params()
+        
         # Re-seed populations slightly to prevent extinction
-        self.r += 0.2
-        self.g += 0.2
-        self.b += 0.2
+        # (bio_step clamps them back into range on the next update)
+        s = self.state
+        boost = to_q(0.2)
+        s[0] += boost
+        s[1] += boost
+        s[2] += boost
 
     def update(self):
         """Calculates the next moment in time (Euler integration)."""
@@ -79,22 +143,15 @@ class BioSystem:
         # R grows, but is eaten by B, and eats G
         # Equation: New = Old + (Growth - Death - EatenByPredator + EatingPrey)
         
-        # We use a simplified Lotka-Volterra cyclic model
-        
-        dr = (self.r * self.growth) - (self.r * self.decay) + (self.r * self.g * self.rate_rg) - (self.r * self.b * self.rate_br)
-        dg = (self.g * self.growth) - (self.g * self.decay) + (self.g * self.b * self.rate_gb) - (self.g * self.r * self.rate_rg)
-        db = (self.b * self.growth) - (self.b * self.decay) + (self.b * self.r * self.rate_br) - (self.b * self.g * self.rate_gb)
-        
-        self.r += dr
-        self.g += dg
-        self.b += db
-        
-        # Clamp to 0.0 - 1.0
-        self.r = max(0.0, min(1.0, self.r))
-        self.g = max(0.0, min(1.0, self.g))
-        self.b = max(0.0, min(1.0, self.b))
-        
-        return self.r, self.g, self.b
+        # We use a simplified Lotka-Volterra cyclic model, stepped by the
+        # viper kernel on Q15 integers. Returns the shared 0-255 output
+        # buffer rather than a fresh tuple.
+        bio_step(self.state, self.params, self.out)
+        return self.out
+
+    def simulate(self, buf):
+        """Computes a whole generation ahead into buf as (r, g, b) byte triples."""
+        fill_trajectory(self.state, self.params, self.out, buf, len(buf) // 3)
 
 def run_bio_loop(joy_x_pin):
     """
@@ -107,27 +164,32 @@ def run_bio_loop(joy_x_pin):
     steps = 0
     GENERATION_LENGTH = 500 # How many ticks before mutation
     
+    # The whole generation is simulated up front; the loop only plays it back
+    trajectory = array.array('B', [0] * (GENERATION_LENGTH * 3))
+    system.simulate(trajectory)
+    
     print("Starting Bio-Cycle...")
 
     while True:
-        # 1. Update Chemistry
-        r_float, g_float, b_float = system.update()
-        
-        # 2. Display
-        # Map 0.0-1.0 to 0-255
-        set_rgb(r_float * 255, g_float * 255, b_float * 255)
+        # 1. + 2. Display the precomputed chemistry for this tick
+        j = steps * 3
+        set_rgb(trajectory[j], trajectory[j + 1], trajectory[j + 2])
         
         # 3. Check for Mutation
         steps += 1
-        if steps > GENERATION_LENGTH:
+        if steps >= GENERATION_LENGTH:
             steps = 0
             
             # Flash White to indicate new generation
             set_rgb(100, 100, 100)
-            utime.sleep(0.1)
             
             system.mutate()
-            print(f"Gen {system.generation_count}: rg={system.rate_rg:.3f} gb={system.rate_gb:.3f} br={system.rate_br:.3f}")
+            system.simulate(trajectory)
+            # Only log every 16th generation to keep string churn out of the loop
+            if system.generation_count & 15 == 0:
+                print("Gen", system.generation_count, "rg/gb/br:", system.rate_rg, system.rate_gb, system.rate_br)
+            
+            utime.sleep(0.1)
 
         # 4. Check Exit
         if joy_x_pin.read_u16() < JOY_EXIT_THRESHOLD:
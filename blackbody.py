@@ -3,7 +3,7 @@
 
 import utime
 import math
-from machine import Pin, PWM
+import led_rgb
 
 # --- Config ---
 COMMON_ANODE = True 
@@ -14,27 +14,32 @@ RED_PIN = 16
 GREEN_PIN = 17
 BLUE_PIN = 18
 
-pwm_r = PWM(Pin(RED_PIN))
-pwm_g = PWM(Pin(GREEN_PIN))
-pwm_b = PWM(Pin(BLUE_PIN))
-pwm_r.freq(1000)
-pwm_g.freq(1000)
-pwm_b.freq(1000)
-
-def set_rgb(r, g, b):
-    # Clamp values
-    r = max(0, min(255, int(r)))
-    g = max(0, min(255, int(g)))
-    b = max(0, min(255, int(b)))
-    
-    if COMMON_ANODE:
-        pwm_r.duty_u16(65535 - (r * 257))
-        pwm_g.duty_u16(65535 - (g * 257))
-        pwm_b.duty_u16(65535 - (b * 257))
-    else:
-        pwm_r.duty_u16(r * 257)
-        pwm_g.duty_u16(g * 257)
-        pwm_b.duty_u16(b * 257)
+set_rgb = led_rgb.init((RED_PIN, GREEN_PIN, BLUE_PIN), COMMON_ANODE)
+
+# --- log() Approximations ---
+# Piecewise quadratic fits (a + b*x + c*x*x) of the two logarithmic terms
+# over the range the algorithm actually feeds them. Each piece is
+# (upper bound, a, b, c); max error is under 1 color step.
+
+# 99.4708025861 * log(x) - 161.1195681661, x in [10, 66]
+GREEN_LOG_FIT = (
+    (18, -51.3264, 14.5928, -0.263103),
+    (32, 6.49274, 8.16313, -0.0823876),
+    (66, 71.5243, 4.22479, -0.0218666),
+)
+
+# 138.5177312231 * log(x) - 305.0447927307, x in [9, 56]
+BLUE_LOG_FIT = (
+    (15, -172.326, 23.5574, -0.494382),
+    (28, -93.3395, 13.276, -0.156048),
+    (56, -1.83493, 6.84188, -0.0412669),
+)
+
+def eval_log_fit(fit, x):
+    for hi, a, b, c in fit:
+        if x <= hi:
+            return a + x * (b + c * x)
+    return None
 
 def kelvin_to_rgb(temp):
     """
@@ -53,7 +58,11 @@ def kelvin_to_rgb(temp):
     # GREEN
     if temp <= 66:
         g = temp
-        g = 99.4708025861 * math.log(g) - 161.1195681661
+        if g >= 10:
+            g = eval_log_fit(GREEN_LOG_FIT, g)
+        else:
+            # Below 1000K is outside the fit
+            g = 99.4708025861 * math.log(g) - 161.1195681661
     else:
         g = temp - 60
         g = 288.1221695283 * (g ** -0.0755148492)
@@ -65,25 +74,45 @@ def kelvin_to_rgb(temp):
         b = 0
     else:
         b = temp - 10
-        b = 138.5177312231 * math.log(b) - 305.0447927307
+        b = eval_log_fit(BLUE_LOG_FIT, b)
 
     return r, g, b
 
+# --- Precomputed Sweep ---
+# The loop only ever visits 1000K-12000K in 100K steps, so the curve is
+# evaluated once at import and stored as clamped (r, g, b) byte triples.
+TEMP_MIN = 1000
+TEMP_MAX = 12000
+TEMP_STEP = 100
+TEMP_COUNT = (TEMP_MAX - TEMP_MIN) // TEMP_STEP + 1  # 111 entries
+
+def _build_temp_lut():
+    lut = bytearray(TEMP_COUNT * 3)
+    for i in range(TEMP_COUNT):
+        rgb = kelvin_to_rgb(TEMP_MIN + i * TEMP_STEP)
+        for k in range(3):
+            c = int(rgb[k])
+            lut[i * 3 + k] = 0 if c < 0 else 255 if c > 255 else c
+    return bytes(lut)
+
+TEMP_LUT = _build_temp_lut()
+
 def run_blackbody_loop(joy_x_pin):
     """
     Cycles heat from 1000K (Ember) to 12000K (Blue Star) and back.
     """
-    temp = 1000
-    direction = 100 # Increment step
+    i = 0 # Index into TEMP_LUT (0 = 1000K)
+    direction = 1 # Increment step (one entry = 100K)
+    last = TEMP_COUNT - 1
     
     while True:
-        r, g, b = kelvin_to_rgb(temp)
-        set_rgb(r, g, b)
+        j = i * 3
+        set_rgb(TEMP_LUT[j], TEMP_LUT[j + 1], TEMP_LUT[j + 2])
         
         # Move temperature
-        temp += direction
-        if temp >= 12000 or temp <= 1000:
-            direction *= -1 # Reverse direction
+        i += direction
+        if i >= last or i <= 0:
+            direction = -direction # Reverse direction
             
         # Check Exit
         if joy_x_pin.read_u16() < JOY_EXIT_THRESHOLD:
@@ -16,7 +16,6 @@ def create_lcd_cutout(thickness):
     screen_cut.translate(App.Vector(-v_area_w/2, -v_area_h/2, -1))
 
     # Create the 4 mounting holes
-    holes = []
     offsets = [
         (-hole_pitch_x/2, -hole_pitch_y/2),
         (hole_pitch_x/2, -hole_pitch_y/2),
@@ -24,15 +23,17 @@ def create_lcd_cutout(thickness):
         (-hole_pitch_x/2, hole_pitch_y/2)
     ]
     
+    # One cylinder, placed four times; the copies share its geometry
+    base_hole = Part.makeCylinder(hole_rad, thickness + 2)
+    holes = []
     for x, y in offsets:
-        h = Part.makeCylinder(hole_rad, thickness + 2)
-        h.translate(App.Vector(x, y, -1))
-        holes.append(h)
-
-    # Fuse all "cutout" parts into one tool
-    cutout_tool = screen_cut
-    for h in holes:
-        cutout_tool = cutout_tool.fuse(h)
+        m = App.Matrix()
+        m.move(App.Vector(x, y, -1))
+        holes.append(base_hole.transformed(m))
+
+    # Group all "cutout" parts into one compound tool so the plate
+    # needs a single boolean cut instead of a chain of fuses
+    cutout_tool = Part.makeCompound([screen_cut] + holes)
         
     return cutout_tool
 
@@ -1,9 +1,10 @@
 # Standalone script for a realistic common-anode RGB LED candle flicker effect.
 
-from machine import Pin, PWM, I2C
+from machine import Pin, I2C
 import utime
 import urandom
 import gc
+import led_rgb
 
 # --- 1. HARDWARE CONFIGURATION (Adjust Pins) ---
 # NOTE: The Pico has a 16-bit PWM system (0 to 65535).
@@ -23,38 +24,27 @@ I2C_SCL_PIN = 5
 
 # Candle flicker is primarily deep/medium orange (High Red, Medium Green, Low Blue)
 # Duty Cycle (0=Bright, 65535=Dim)
+# Each range spans a power of two so a value is just MIN + getrandbits(BITS).
 
 # RED: Brightest (low duty cycle) for the core orange/red flame.
 R_MIN = 0
-R_MAX = 15000
+R_BITS = 14 # 0 - 16383
 
 # GREEN: Medium Brightness for the orange/yellow mix.
-G_MIN = 15000
-G_MAX = 40000
+G_MIN = 11000
+G_BITS = 15 # 11000 - 43767
 
 # BLUE: Very dim/off for the slight hint of whiter tone in the flame tips.
-B_MIN = 50000
-B_MAX = 65535
+B_MIN = 49152
+B_BITS = 14 # 49152 - 65535
 
 # TIME: Random delay for a natural flicker (in milliseconds)
-TIME_MIN_MS = 10
-TIME_MAX_MS = 50 
+TIME_MIN_MS = 14
+TIME_BITS = 5 # 14 - 45 ms
 PWM_FREQUENCY = 1000 # Set a high frequency for smooth color changes
 
 # --- 3. HELPER FUNCTIONS ---
 
-def init_pwm(pin_num):
-    """Initializes and returns a PWM object for the given pin."""
-    pwm = PWM(Pin(pin_num))
-    pwm.freq(PWM_FREQUENCY)
-    return pwm
-
-def set_rgb_color_u16(r_pwm, g_pwm, b_pwm, r_val, g_val, b_val):
-    """Sets the common-anode RGB LED color using 16-bit duty cycles."""
-    r_pwm.duty_u16(r_val)
-    g_pwm.duty_u16(g_val)
-    b_pwm.duty_u16(b_val)
-
 def disable_lcd_backlight():
     """Initializes I2C and attempts to turn off the LCD backlight."""
     try:
@@ -86,13 +76,17 @@ def disable_lcd_backlight():
 def run_candle_flicker():
     """Initializes hardware and runs the candle flicker loop."""
     
-    # Initialize PWM outputs
-    r_pwm = init_pwm(RED_PIN)
-    g_pwm = init_pwm(GREEN_PIN)
-    b_pwm = init_pwm(BLUE_PIN)
+    # Initialize PWM outputs; the setter takes raw common-anode duty cycles
+    pins = (RED_PIN, GREEN_PIN, BLUE_PIN)
+    set_rgb_color_u16 = led_rgb.init_u16(pins, PWM_FREQUENCY)
 
     print("RGB PWM initialized. Starting candle flicker...")
     
+    # Let the allocator schedule collections instead of forcing a full heap
+    # walk every flicker step (the loop only produces small ints anyway)
+    gc.collect()
+    gc.threshold(gc.mem_free() // 4)
+    
     # Randomly seed the generator for more unpredictable flicker
     try:
         urandom.seed(utime.ticks_us())
@@ -103,27 +97,23 @@ def run_candle_flicker():
     try:
         while True:
             # Generate random duty cycles within the flame color ranges
-            r_val = urandom.randint(R_MIN, R_MAX)
-            g_val = urandom.randint(G_MIN, G_MAX)
-            b_val = urandom.randint(B_MIN, B_MAX)
+            r_val = R_MIN + urandom.getrandbits(R_BITS)
+            g_val = G_MIN + urandom.getrandbits(G_BITS)
+            b_val = B_MIN + urandom.getrandbits(B_BITS)
             
             # Set the new color
-            set_rgb_color_u16(r_pwm, g_pwm, b_pwm, r_val, g_val, b_val)
+            set_rgb_color_u16(r_val, g_val, b_val)
             
             # Random delay for the flicker rate
-            utime.sleep_ms(urandom.randint(TIME_MIN_MS, TIME_MAX_MS))
-            
-            gc.collect() # Perform garbage collection periodically
+            utime.sleep_ms(TIME_MIN_MS + urandom.getrandbits(TIME_BITS))
             
     except KeyboardInterrupt:
         print("Candle flicker stopped.")
     finally:
         # Turn off the LED when the script exits
-        set_rgb_color_u16(r_pwm, g_pwm, b_pwm, 65535, 65535, 65535)
+        set_rgb_color_u16(65535, 65535, 65535)
         # Deinitialize PWM
-        r_pwm.deinit()
-        g_pwm.deinit()
-        b_pwm.deinit()
+        led_rgb.deinit(pins)
 
 # --- 5. APPLICATION ENTRY POINT ---
 
@@ -2,12 +2,12 @@
 # Uses "Rubber Band" time to map a 24-step color chart to variable day lengths.
 # Features dedicated high-res Sunrise/Sunset sequences.
 
-import network
-import urequests
-import ujson
 import utime
-import math
-from machine import Pin, PWM
+import gc
+import array
+import micropython
+import led_rgb
+from machine import Timer
 
 # --- User Configuration ---
 # Your default "Ideal" times (used if WiFi fails)
@@ -16,104 +16,152 @@ FALLBACK_SUNSET = 18.0
 TWILIGHT_DURATION = 0.75  # 45 minutes of dedicated sunrise/sunset transition
 
 # --- The 24-Hour Master Palette (The "Ideal" Day) ---
-# Index 0 = Midnight, Index 12 = High Noon.
+# Flat (r, g, b) bytes, one row per hour: row 0 = Midnight, row 12 = High Noon.
 # Adjusted for more saturation during day, better brightness at night.
-HOURLY_COLORS = [
-    (5, 0, 20),      # 00:00 Midnight (Deep Blue/Purple)
-    (5, 0, 25),      # 01:00
-    (8, 0, 30),      # 02:00
-    (10, 0, 40),     # 03:00
-    (15, 5, 60),     # 04:00 (Faint pre-dawn)
-    (30, 10, 80),    # 05:00 (Blue hour)
-    (255, 100, 50),  # 06:00 (Sunrise Placeholder - Overridden by Sequence)
-    (255, 160, 80),  # 07:00 (Morning Gold)
-    (255, 200, 100), # 08:00
-    (200, 220, 255), # 09:00 (Brightening Sky)
-    (180, 240, 255), # 10:00 (Clear Blue Sky)
-    (200, 255, 255), # 11:00 (Noon White)
-    (220, 255, 255), # 12:00 (High Noon)
-    (200, 255, 255), # 13:00
-    (180, 240, 255), # 14:00
-    (200, 220, 255), # 15:00
-    (255, 200, 120), # 16:00 (Afternoon Gold)
-    (255, 150, 50),  # 17:00 (Late Sun)
-    (200, 50, 20),   # 18:00 (Sunset Placeholder - Overridden by Sequence)
-    (100, 0, 100),   # 19:00 (Post-Sunset Purple - Brighter than before)
-    (60, 0, 140),    # 20:00 (Deep Twilight)
-    (40, 0, 100),    # 21:00
-    (20, 0, 80),     # 22:00
-    (10, 0, 40),     # 23:00
-]
+HOURLY_COLORS = bytes((
+    5, 0, 20,       # 00:00 Midnight (Deep Blue/Purple)
+    5, 0, 25,       # 01:00
+    8, 0, 30,       # 02:00
+    10, 0, 40,      # 03:00
+    15, 5, 60,      # 04:00 (Faint pre-dawn)
+    30, 10, 80,     # 05:00 (Blue hour)
+    255, 100, 50,   # 06:00 (Sunrise Placeholder - Overridden by Sequence)
+    255, 160, 80,   # 07:00 (Morning Gold)
+    255, 200, 100,  # 08:00
+    200, 220, 255,  # 09:00 (Brightening Sky)
+    180, 240, 255,  # 10:00 (Clear Blue Sky)
+    200, 255, 255,  # 11:00 (Noon White)
+    220, 255, 255,  # 12:00 (High Noon)
+    200, 255, 255,  # 13:00
+    180, 240, 255,  # 14:00
+    200, 220, 255,  # 15:00
+    255, 200, 120,  # 16:00 (Afternoon Gold)
+    255, 150, 50,   # 17:00 (Late Sun)
+    200, 50, 20,    # 18:00 (Sunset Placeholder - Overridden by Sequence)
+    100, 0, 100,    # 19:00 (Post-Sunset Purple - Brighter than before)
+    60, 0, 140,     # 20:00 (Deep Twilight)
+    40, 0, 100,     # 21:00
+    20, 0, 80,      # 22:00
+    10, 0, 40,      # 23:00
+))
 
 # --- Special Event Sequences ---
 # These play exactly at sunrise/sunset, overriding the hourly list.
-SEQ_SUNRISE = [
-    (10, 0, 60),    # Dark Blue
-    (40, 0, 80),    # Violet
-    (120, 20, 60),  # Deep Pink
-    (255, 80, 20),  # Red-Orange
-    (255, 180, 50), # Gold
-    (255, 220, 150) # Bright Morning
-]
-
-SEQ_SUNSET = [
-    (255, 200, 100), # Late Afternoon
-    (255, 140, 20),  # Golden Hour
-    (200, 50, 10),   # Deep Orange
-    (150, 20, 80),   # Purple/Pink
-    (60, 0, 120),    # Twilight Blue
-    (20, 0, 80)      # Night Fall
-]
+SEQ_SUNRISE = bytes((
+    10, 0, 60,     # Dark Blue
+    40, 0, 80,     # Violet
+    120, 20, 60,   # Deep Pink
+    255, 80, 20,   # Red-Orange
+    255, 180, 50,  # Gold
+    255, 220, 150, # Bright Morning
+))
+
+SEQ_SUNSET = bytes((
+    255, 200, 100,  # Late Afternoon
+    255, 140, 20,   # Golden Hour
+    200, 50, 10,    # Deep Orange
+    150, 20, 80,    # Purple/Pink
+    60, 0, 120,     # Twilight Blue
+    20, 0, 80,      # Night Fall
+))
 
 # --- Hardware Init ---
-pwm_r = PWM(Pin(16))
-pwm_g = PWM(Pin(17))
-pwm_b = PWM(Pin(18))
-for pwm in [pwm_r, pwm_g, pwm_b]:
-    pwm.freq(1000)
-
-def set_rgb(r, g, b):
-    # Common Anode Inversion
-    pwm_r.duty_u16(65535 - (int(r) * 257))
-    pwm_g.duty_u16(65535 - (int(g) * 257))
-    pwm_b.duty_u16(65535 - (int(b) * 257))
-
-def interpolate_color(color1, color2, factor):
-    r = color1[0] + (color2[0] - color1[0]) * factor
-    g = color1[1] + (color2[1] - color1[1]) * factor
-    b = color1[2] + (color2[2] - color1[2]) * factor
-    return (r, g, b)
-
-def get_color_from_sequence(seq, progress):
-    # Maps 0.0-1.0 to a list of colors
-    idx_float = progress * (len(seq) - 1)
-    idx_int = int(idx_float)
-    factor = idx_float - idx_int
-    if idx_int >= len(seq) - 1: return seq[-1]
-    return interpolate_color(seq[idx_int], seq[idx_int+1], factor)
+# Common Anode LED on pins 16-18
+set_rgb = led_rgb.init((16, 17, 18), common_anode=True)
+
+# --- Prepared Palettes ---
+# Each key color is stored as 6 ints: [r<<8, dr, g<<8, dg, b<<8, db], where
+# d* is the step to the next key. Interpolation is then integer-only with
+# an 8-bit (Q8) fraction between keys.
+def prepare_palette(colors, wrap=False):
+    # colors is flat (r, g, b) bytes
+    n = len(colors) // 3
+    pal = array.array('i', [0] * (n * 6))
+    for i in range(n):
+        c1 = i * 3
+        if i + 1 < n:
+            c2 = c1 + 3
+        elif wrap:
+            c2 = 0
+        else:
+            c2 = c1 # Last key holds its color
+        for k in range(3):
+            pal[i * 6 + k * 2] = colors[c1 + k] << 8
+            pal[i * 6 + k * 2 + 1] = colors[c2 + k] - colors[c1 + k]
+    return pal
+
+PAL_HOURLY = prepare_palette(HOURLY_COLORS, wrap=True)
+
+# The event sequences are split into one contiguous bytes per channel
+# (R, G, B) and interpolated channel-by-channel with lerp_ch.
+def split_channels(colors):
+    return (colors[0::3], colors[1::3], colors[2::3])
+
+PAL_SUNRISE = split_channels(SEQ_SUNRISE)
+PAL_SUNSET = split_channels(SEQ_SUNSET)
+
+def show_interpolated(pal, idx, frac):
+    # frac is the Q8 (0-255) distance from key idx towards the next key.
+    # Writes straight to the LED so no color tuple is built.
+    j = idx * 6
+    set_rgb((pal[j] + pal[j + 1] * frac) >> 8,
+            (pal[j + 2] + pal[j + 3] * frac) >> 8,
+            (pal[j + 4] + pal[j + 5] * frac) >> 8)
+
+@micropython.viper
+def lerp_ch(ch, last: int, prog_q: int) -> int:
+    # Interpolates one channel at Q16 progress (0-65536) across keys 0..last
+    p = ptr8(ch)
+    if prog_q <= 0:
+        return p[0]
+    pos = prog_q * last
+    idx = pos >> 16
+    if idx >= last:
+        return p[last]
+    frac = (pos >> 8) & 0xFF
+    a = p[idx]
+    return ((a << 8) + (p[idx + 1] - a) * frac) >> 8
+
+def show_sequence(pal, progress):
+    # Maps 0.0-1.0 to a split sequence palette
+    r, g, b = pal
+    last = len(r) - 1
+    prog_q = int(progress * 65536)
+    set_rgb(lerp_ch(r, last, prog_q),
+            lerp_ch(g, last, prog_q),
+            lerp_ch(b, last, prog_q))
+
+def fetch_json(url):
+    """GETs a URL and parses the JSON straight off the socket."""
+    # Only needed on the sync path, so not held in RAM from boot
+    import urequests
+    import ujson
+    r = urequests.get(url)
+    try:
+        # Streaming avoids holding the whole body as a str next to the dict
+        return ujson.load(r.raw)
+    finally:
+        r.close()
 
 def get_solar_times(lcd):
     """Fetches solar data or returns fallback."""
     try:
         # IP Geolocation
-        r = urequests.get("http://ip-api.com/json/")
-        loc = r.json()
-        r.close()
+        loc = fetch_json("http://ip-api.com/json/")
         lat, lon = loc['lat'], loc['lon']
+        del loc
         
         # Solar Data
         lcd.move_to(0, 1)
         lcd.putstr("Fetching Sun...")
         url = f"https://api.sunrise-sunset.org/json?lat={lat}&lng={lon}&formatted=0"
-        r = urequests.get(url)
-        data = r.json()['results']
-        r.close()
+        data = fetch_json(url)['results']
         
         # Parse ISO Time
+        # formatted=0 always returns "YYYY-MM-DDTHH:MM:SS+00:00", so the
+        # hour and minute sit at fixed offsets (no split/map lists needed)
         def parse_h(iso):
-            t = iso.split('T')[1].split('+')[0]
-            h, m, s = map(int, t.split(':'))
-            return h + (m/60)
+            return int(iso[11:13]) + int(iso[14:16]) / 60
 
         # ADJUST YOUR TIMEZONE HERE
         TZ = -4 
@@ -124,48 +172,59 @@ def get_solar_times(lcd):
         return rise, set_
     except:
         return FALLBACK_SUNRISE, FALLBACK_SUNSET
+    finally:
+        # Reclaim the response buffers before the LED loop starts
+        gc.collect()
 
-def get_virtual_hour(current_h, rise, set_):
+def build_segments(rise, set_):
     """
-    The Elastic Time Engine.
-    Maps real world time to the 'Ideal Day' (0-23) based on phase.
+    The Elastic Time Engine, precomputed.
+    Splits one day (starting at the sunrise window) into ordered segments of
+    (start, end, palette, v0, rate). Inside a segment the palette position is
+    v0 + (hour - start) * rate: 0.0-1.0 for the sunrise/sunset sequences, and
+    'Ideal Day' hours for PAL_HOURLY (values past 24 wrap at lookup).
     """
+    tw2 = TWILIGHT_DURATION / 2
+    inv_tw = 1.0 / TWILIGHT_DURATION
+    inv_day = 12.0 / (set_ - rise)           # Ideal hours per real hour
+    inv_night = 12.0 / ((24 - set_) + rise)
     
-    # 1. Sunrise Sequence Window
-    # If we are within the transition window of sunrise
-    if abs(current_h - rise) <= (TWILIGHT_DURATION / 2):
-        # Return a special flag or handle logic outside
-        return "SUNRISE"
-        
-    # 2. Sunset Sequence Window
-    if abs(current_h - set_) <= (TWILIGHT_DURATION / 2):
-        return "SUNSET"
-        
-    # 3. Day Phase (Between Rise and Set)
-    if current_h > rise and current_h < set_:
-        # We need to map [Rise -> Set] to [Ideal 6 -> Ideal 18]
-        day_progress = (current_h - rise) / (set_ - rise)
-        # Map 0.0-1.0 to 6.0-18.0
-        return 6.0 + (day_progress * 12.0)
-        
-    # 4. Night Phase
-    else:
-        # We need to map [Set -> Rise] to [Ideal 18 -> Ideal 6] (wrapping 24)
-        
-        # Calculate time since sunset
-        if current_h >= set_:
-            time_passed = current_h - set_
-        else:
-            time_passed = (24 - set_) + current_h
-            
-        night_length = (24 - set_) + rise
-        night_progress = time_passed / night_length
-        
-        # Map 0.0-1.0 to 18.0 - 30.0 (where 30 is 6am next day)
-        virtual = 18.0 + (night_progress * 12.0)
-        return virtual % 24
+    rise_lo = rise - tw2
+    rise_hi = rise + tw2
+    set_lo = set_ - tw2
+    set_hi = set_ + tw2
+    
+    return [
+        # 1. Sunrise Sequence Window
+        (rise_lo, rise_hi, PAL_SUNRISE, 0.0, inv_tw),
+        # 2. Day Phase: [Rise -> Set] maps to [Ideal 6 -> Ideal 18]
+        (rise_hi, set_lo, PAL_HOURLY, 6.0 + tw2 * inv_day, inv_day),
+        # 3. Sunset Sequence Window
+        (set_lo, set_hi, PAL_SUNSET, 0.0, inv_tw),
+        # 4. Night Phase: [Set -> Rise] maps to [Ideal 18 -> Ideal 30 (6am)]
+        (set_hi, rise_lo + 24, PAL_HOURLY, 18.0 + tw2 * inv_night, inv_night),
+    ]
+
+@micropython.native
+def get_virtual_hour(segments, current_h):
+    """
+    Maps real world time to (palette, position) with one ordered search.
+    Only compares and one multiply-add; all bounds and rates are precomputed.
+    """
+    # Unwrap the hour so the day runs start -> start + 24 with no midnight case
+    day_start = segments[0][0]
+    if current_h < day_start:
+        current_h += 24
+    elif current_h >= day_start + 24:
+        current_h -= 24
+    
+    for start, end, pal, v0, rate in segments:
+        if current_h < end:
+            break
+    return pal, v0 + (current_h - start) * rate
 
 def run_circadian_loop(lcd, joy_x_pin):
+    import network
     import clock_app # For WiFi credentials
     
     lcd.clear()
@@ -179,6 +238,7 @@ def run_circadian_loop(lcd, joy_x_pin):
         utime.sleep(5)
         
     rise, set_ = get_solar_times(lcd)
+    segments = build_segments(rise, set_)
     
     lcd.clear()
     lcd.putstr(f"Rise:{rise:.1f} Set:{set_:.1f}")
@@ -186,46 +246,39 @@ def run_circadian_loop(lcd, joy_x_pin):
     lcd.backlight_off()
     lcd.clear()
     
-    while True:
+    def tick(timer):
         # Get Time
         t = utime.localtime()
         current_h = t[3] + (t[4]/60) + (t[5]/3600)
         
-        mode = get_virtual_hour(current_h, rise, set_)
-        
-        rgb = (0,0,0)
+        pal, pos = get_virtual_hour(segments, current_h)
         
-        if mode == "SUNRISE":
-            # Determine progress through sunrise window
-            # Window starts at rise - (duration/2)
-            start_w = rise - (TWILIGHT_DURATION/2)
-            prog = (current_h - start_w) / TWILIGHT_DURATION
-            rgb = get_color_from_sequence(SEQ_SUNRISE, prog)
-            
-        elif mode == "SUNSET":
-            start_w = set_ - (TWILIGHT_DURATION/2)
-            prog = (current_h - start_w) / TWILIGHT_DURATION
-            rgb = get_color_from_sequence(SEQ_SUNSET, prog)
-            
+        if pal is PAL_HOURLY:
+            # Standard Hourly Interpolation (Q8 position within the day)
+            pos = int(pos * 256)
+            idx = (pos >> 8) % 24
+            show_interpolated(PAL_HOURLY, idx, pos & 0xFF)
         else:
-            # Standard Hourly Interpolation
-            idx = int(mode)
-            next_idx = (idx + 1) % 24
-            factor = mode - idx
-            
-            c1 = HOURLY_COLORS[idx]
-            c2 = HOURLY_COLORS[next_idx]
-            rgb = interpolate_color(c1, c2, factor)
-            
-        set_rgb(*rgb)
-        
+            # Sunrise/Sunset sequence, pos is progress through the window
+            show_sequence(pal, pos)
+    
+    # Drop the WiFi/JSON garbage before the long-running loop
+    gc.collect()
+    
+    # LED updates run from a 1 s hardware timer; this thread only waits
+    # for the joystick, sleeping in between
+    tick(None)
+    timer = Timer(-1)
+    timer.init(period=1000, mode=Timer.PERIODIC, callback=tick)
+    try:
         # Exit Check
-        if joy_x_pin.read_u16() < 20000:
-            set_rgb(0,0,0)
-            lcd.backlight_on()
-            lcd.clear()
-            lcd.putstr("Exiting...")
-            utime.sleep(1)
-            return
-            
-        utime.sleep(1)
+        while joy_x_pin.read_u16() >= 20000:
+            utime.sleep_ms(100)
+    finally:
+        timer.deinit()
+    
+    set_rgb(0,0,0)
+    lcd.backlight_on()
+    lcd.clear()
+    lcd.putstr("Exiting...")
+    utime.sleep(1)
@@ -4,7 +4,7 @@
 import usocket
 import utime
 import ustruct
-from machine import RTC
+from machine import RTC, Timer
 import gc
 import config # Import config for timezone settings
 
@@ -12,36 +12,55 @@ import config # Import config for timezone settings
 NTP_SERVER = "pool.ntp.org"
 NTP_DELTA = 2208988800  # 1900-1970 epoch difference
 RESYNC_INTERVAL_SECONDS = 60 * 60 * 6 # Sync with internet every 6 hours
+RESYNC_INTERVAL_MS = RESYNC_INTERVAL_SECONDS * 1000
+RETRY_MIN_MS = 60 * 1000 # First retry after a failed sync; doubles up to the resync interval
+_NTP_REQ = b'\x1b' + b'\0' * 47 # Client request packet, built once
 
 # --- Global variables ---
-last_sync_time = 0
+# Sync scheduling runs on ticks_ms, which NTP never steps
+last_sync_ticks = None # ticks_ms() of the last sync attempt, None before the first
+next_sync_ms = 0 # Wait after last_sync_ticks before the next attempt
+retry_ms = RETRY_MIN_MS
+_ntp_addr = None # Resolved NTP server address; cleared after a failed sync
 rtc = RTC()
 last_exit_time = 0
 DEBOUNCE_DELAY_MS = 500
 
+# What is currently on the LCD, so only changed characters are rewritten
+_last_time_str = ""
+_last_date_str = ""
+
 def get_ntp_time(wlan):
     """Fetches the current time from an NTP server."""
+    global _ntp_addr
     if not wlan or not wlan.isconnected():
         return None
     
+    s = None
     try:
-        addr = usocket.getaddrinfo(NTP_SERVER, 123)[0][-1]
+        # DNS is only resolved on the first sync or after a failure
+        if _ntp_addr is None:
+            _ntp_addr = usocket.getaddrinfo(NTP_SERVER, 123)[0][-1]
         s = usocket.socket(usocket.AF_INET, usocket.SOCK_DGRAM)
         s.settimeout(2)
-        s.sendto(b'\x1b' + 47 * b'\0', addr)
+        s.sendto(_NTP_REQ, _ntp_addr)
         msg = s.recv(48)
-        s.close()
         val = ustruct.unpack_from("!I", msg, 40)[0]
         return val - NTP_DELTA
     except Exception:
+        _ntp_addr = None
         return None
+    finally:
+        if s:
+            s.close()
 
 def set_rtc_from_ntp(lcd, wlan):
     """Syncs the Pico's RTC with time from an NTP server."""
-    global last_sync_time
+    global last_sync_ticks, next_sync_ms, retry_ms
     
     # Only display 'Syncing' on the very first sync to avoid disruption
-    if last_sync_time == 0:
+    first = last_sync_ticks is None
+    if first:
         lcd.clear()
         lcd.putstr("Syncing Time...")
         
@@ -52,15 +71,19 @@ def set_rtc_from_ntp(lcd, wlan):
         gmt_tuple = utime.gmtime(ntp_timestamp)
         rtc.datetime((gmt_tuple[0], gmt_tuple[1], gmt_tuple[2], gmt_tuple[6],
                       gmt_tuple[3], gmt_tuple[4], gmt_tuple[5], 0))
-        last_sync_time = utime.time()
+        next_sync_ms = RESYNC_INTERVAL_MS
+        retry_ms = RETRY_MIN_MS
         
-        if last_sync_time == 0: # Feedback only on first load
+        if first: # Feedback only on first load
             lcd.clear()
             lcd.putstr("Time Synced!")
             utime.sleep(1)
     else:
-        # If sync fails, we just keep going with internal clock
-        pass
+        # If sync fails, keep going with the internal clock and back off
+        # so flapping WiFi doesn't hammer DNS/NTP
+        next_sync_ms = retry_ms
+        retry_ms = min(retry_ms * 2, RESYNC_INTERVAL_MS)
+    last_sync_ticks = utime.ticks_ms()
 
 def check_exit(joy_x_pin):
     """Checks for a joystick left movement to exit."""
@@ -74,6 +97,19 @@ def check_exit(joy_x_pin):
             return True
     return False
 
+# DST transition days per year: year -> (March start day, November end day)
+_DST_CACHE = {}
+
+def _dst_bounds(year):
+    """Returns the cached (start_day, end_day) of US DST for the year."""
+    bounds = _DST_CACHE.get(year)
+    if bounds is None:
+        k = (1 + year * 5 // 4) % 7
+        # 2nd Sunday in March, 1st Sunday in November
+        bounds = (14 - k, 7 - k)
+        _DST_CACHE[year] = bounds
+    return bounds
+
 def is_dst(year, month, day, hour):
     """
     Determines if the given date/time is within US Daylight Saving Time.
@@ -83,54 +119,40 @@ def is_dst(year, month, day, hour):
     if month < 3 or month > 11: return False # Jan, Feb, Dec are standard
     if month > 3 and month < 11: return True # Apr-Oct are DST
     
-    previous_sunday = day - (utime.localtime(utime.mktime((year, month, day, 0, 0, 0, 0, 0)))[6] + 1) % 7
-    
-    if month == 3: # March: DST starts 2nd Sunday
-        # If day is after the 14th, it's definitely DST.
-        # If day is before the 8th, it's definitely Standard.
-        # Between 8 and 14, we check the Sunday logic.
-        second_sunday = 0
-        # Calculate date of 2nd sunday
-        # (This is a simplified approximation sufficient for this project)
-        # A full calendar calculation is heavy, but we can check simply:
-        # In March, the 2nd Sunday is between the 8th and the 14th.
-        if day < 8: return False
-        if day > 14: return True
-        
-        # We are in the transition week. 
-        # Get the weekday of the current day (0=Mon, 6=Sun)
-        t = (year, month, day, hour, 0, 0, 0, 0)
-        weekday = utime.localtime(utime.mktime(t))[6]
-        
-        # If it is Sunday (6)
-        if weekday == 6:
-            return hour >= 2
-        
-        # If we passed Sunday already this week?
-        # This is getting complex. Let's try the specific formula method:
-        
-        # Formula to find the day of 2nd Sunday in March:
-        # 14 - (1 + year * 5 // 4) % 7
-        dst_start_day = 14 - (1 + int(year * 5 / 4)) % 7
-        if day > dst_start_day: return True
-        if day < dst_start_day: return False
-        if day == dst_start_day: return hour >= 2
-
-    if month == 11: # Nov: DST ends 1st Sunday
-        # 1st Sunday is between 1st and 7th
-        # Formula for 1st Sunday in Nov:
-        # 7 - (1 + year * 5 // 4) % 7
-        dst_end_day = 7 - (1 + int(year * 5 / 4)) % 7
-        if day > dst_end_day: return False
-        if day < dst_end_day: return True
-        if day == dst_end_day: return hour < 2
-        
-    return False
-
-def display_time_and_date(lcd):
-    """Displays the current local time and date."""
-    # 1. Get UTC timestamp
-    current_utc = utime.time()
+    start_day, end_day = _dst_bounds(year)
+    if month == 3:
+        return day > start_day or (day == start_day and hour >= 2)
+    # November
+    return day < end_day or (day == end_day and hour < 2)
+
+def reset_display_cache():
+    """Forget what is on screen; call after lcd.clear() so the next update redraws."""
+    global _last_time_str, _last_date_str
+    _last_time_str = ""
+    _last_date_str = ""
+
+def put_changed(lcd, row, new, old):
+    """Writes only the runs of characters in `new` that differ from `old`."""
+    if len(old) != len(new):
+        lcd.move_to(0, row)
+        lcd.putstr(new)
+        return
+    col = 0
+    n = len(new)
+    while col < n:
+        if new[col] == old[col]:
+            col += 1
+            continue
+        end = col + 1
+        while end < n and new[end] != old[end]:
+            end += 1
+        lcd.move_to(col, row)
+        lcd.putstr(new[col:end])
+        col = end
+
+def display_time_and_date(lcd, current_utc):
+    """Displays the local time and date for a UTC timestamp."""
+    # 1. The caller already read the UTC timestamp
     
     # 2. Get Basic Local (Standard Time) Tuple
     # We use the config offset (e.g., -5 for EST)
@@ -160,14 +182,17 @@ def display_time_and_date(lcd):
     time_str = "{:02d}:{:02d}:{:02d} {}".format(hour, minute, second, am_pm)
     date_str = "{:02d}/{:02d}/{:04d}".format(month, day, year)
 
-    lcd.move_to(0, 0)
-    lcd.putstr(time_str)
-    lcd.move_to(0, 1)
-    lcd.putstr(date_str)
+    global _last_time_str, _last_date_str
+    if time_str != _last_time_str:
+        put_changed(lcd, 0, time_str, _last_time_str)
+        _last_time_str = time_str
+    # The date changes once a day
+    if date_str != _last_date_str:
+        put_changed(lcd, 1, date_str, _last_date_str)
+        _last_date_str = date_str
 
 def run_clock_app(lcd, joy_x_pin, wlan):
     """The main entry point for the clock app."""
-    global last_sync_time
 
     lcd.clear()
     
@@ -176,35 +201,49 @@ def run_clock_app(lcd, joy_x_pin, wlan):
     
     # Force a clear before starting the loop
     lcd.clear()
+    reset_display_cache()
     
     last_second_display = -1
+    paused = False # Set while this thread owns the LCD (NTP sync)
 
-    while True:
-        current_timestamp = utime.time()
-        
-        # 1. Re-sync with NTP if interval passed
-        if current_timestamp - last_sync_time >= RESYNC_INTERVAL_SECONDS:
-            set_rtc_from_ntp(lcd, wlan)
-            lcd.clear() # Clear after sync message
-            last_second_display = -1 # Force refresh
-
-        # 2. Update Display (Non-blocking, only when second changes)
-        # We check the current second from the RTC
-        # Note: We grab the raw second from UTC to detect change
-        current_second = utime.localtime()[5] 
+    def tick(timer):
+        nonlocal last_second_display
+        if paused:
+            return
+
+        # 2. Update Display (only when second changes)
+        # One RTC read per tick; the timestamp is passed down for display
+        now = utime.time()
+        current_second = now % 60
         
         if current_second != last_second_display:
-            display_time_and_date(lcd)
+            display_time_and_date(lcd, now)
             last_second_display = current_second
 
-        # 3. Check Exit
-        if check_exit(joy_x_pin):
-            lcd.clear()
-            lcd.putstr("Back to Menu...")
-            utime.sleep(1)
-            return
+    # The display is refreshed from a 250 ms hardware timer, which never
+    # misses a second; this thread handles re-sync and exit.
+    timer = Timer(-1)
+    timer.init(period=250, mode=Timer.PERIODIC, callback=tick)
+    try:
+        while True:
+            # 1. Re-sync with NTP if interval passed (monotonic, immune to RTC steps)
+            if utime.ticks_diff(utime.ticks_ms(), last_sync_ticks) >= next_sync_ms:
+                paused = True
+                set_rtc_from_ntp(lcd, wlan)
+                lcd.clear() # Clear after sync message
+                reset_display_cache()
+                last_second_display = -1 # Force refresh
+                paused = False
+
+            # 3. Check Exit
+            if check_exit(joy_x_pin):
+                break
+
+            # 4. Sleep until the next joystick check (check_exit debounces)
+            utime.sleep_ms(200)
+    finally:
+        timer.deinit()
 
-        # 4. Short Sleep
-        # Checking every 50ms ensures we never miss a second, 
-        # but don't hog the CPU.
-        utime.sleep_ms(50) 
+    lcd.clear()
+    lcd.putstr("Back to Menu...")
+    utime.sleep(1)
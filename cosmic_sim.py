@@ -5,16 +5,14 @@
 import utime
 import math
 import random
-from machine import Pin, PWM
+import array
+import micropython
+import led_rgb
+from machine import Timer
 
 # --- Hardware Setup ---
-# LCD is passed in from main, but we need PWM for LED
-pwm_r = PWM(Pin(16))
-pwm_g = PWM(Pin(17))
-pwm_b = PWM(Pin(18))
-for p in [pwm_r, pwm_g, pwm_b]:
-    p.freq(1000)
-
+# LCD is passed in from main; the LED goes through the shared led_rgb driver
+LED_PINS = (16, 17, 18)
 COMMON_ANODE = True 
 
 # --- Astrophysics Database ---
@@ -95,41 +93,57 @@ def kelvin_to_rgb(temp):
     
     return int(r), int(g), int(b)
 
-def calculate_interaction(star_rgb, planet_rgb, intensity):
+def pack_rgb(rgb):
+    """(R, G, B) -> 0xRRGGBB"""
+    return (rgb[0] << 16) | (rgb[1] << 8) | rgb[2]
+
+# --- Precomputed Tables ---
+# Stars and planets are a small fixed set, so their physics is done once.
+# Colors are packed 0xRRGGBB ints so the viper kernel can take them directly.
+# Format: ("Name", Temperature_Kelvin, 0xRRGGBB blackbody, peak_nm)
+STAR_TABLE = [(n, t, pack_rgb(kelvin_to_rgb(t)), int(wiens_displacement(t))) for n, t in STARS]
+
+# Format: ("Name", 0xRRGGBB atmosphere)
+PLANET_TABLE = [(n, pack_rgb(rgb)) for n, rgb in PLANETS]
+
+@micropython.viper
+def calculate_interaction(star: int, planet: int, iq: int) -> int:
     """
     Simulates light passing through atmosphere.
-    Multiply star color by planet atmosphere color.
+    Multiply star color by planet atmosphere color, all in integers.
+    star/planet are 0xRRGGBB, iq is intensity in Q15 (32768 = 1.0).
+    Returns the result packed as 0xRRGGBB.
     """
-    # Normalize 0-1
-    sr, sg, sb = star_rgb[0]/255, star_rgb[1]/255, star_rgb[2]/255
-    pr, pg, pb = planet_rgb[0]/255, planet_rgb[1]/255, planet_rgb[2]/255
-    
-    # Atmospheric filtering (Multiplication)
-    r = sr * pr
-    g = sg * pg
-    b = sb * pb
-    
-    # Apply Intensity (Inverse Square Law Simulation)
-    r *= intensity
-    g *= intensity
-    b *= intensity
+    # Atmospheric filtering times intensity (Inverse Square Law Simulation)
+    # in one product per channel, divided by 255 * 32768 with rounding:
+    # x / (255 * 32768) ~= (x + x / 256) / 2^23, plus half an LSB (2^22).
+    # The largest sum (255 * 255 * 32768 case) still fits in 31 bits, and
+    # rounds back to exactly 255, so full white at 1.0 stays 0xFFFFFF.
+    x = (star >> 16) * (planet >> 16) * iq
+    r = (x + (x >> 8) + 0x400000) >> 23
+    x = ((star >> 8) & 0xFF) * ((planet >> 8) & 0xFF) * iq
+    g = (x + (x >> 8) + 0x400000) >> 23
+    x = (star & 0xFF) * (planet & 0xFF) * iq
+    b = (x + (x >> 8) + 0x400000) >> 23
     
-    return int(r * 255), int(g * 255), int(b * 255)
-
-def set_rgb(r, g, b):
-    # Gamma correction for better eye perception
-    r = int((r/255)**2 * 255)
-    g = int((g/255)**2 * 255)
-    b = int((b/255)**2 * 255)
-
-    if COMMON_ANODE:
-        pwm_r.duty_u16(65535 - (r * 257))
-        pwm_g.duty_u16(65535 - (g * 257))
-        pwm_b.duty_u16(65535 - (b * 257))
-    else:
-        pwm_r.duty_u16(r * 257)
-        pwm_g.duty_u16(g * 257)
-        pwm_b.duty_u16(b * 257)
+    return (r << 16) | (g << 8) | b
+
+# Gamma correction for better eye perception ((x/255)^2 * 255), with the
+# 0-65535 duty scaling and common-anode inversion folded into one table
+GAMMA_DUTY = array.array('H', [(i * i // 255) * 257 for i in range(256)])
+if COMMON_ANODE:
+    GAMMA_DUTY = array.array('H', [65535 - d for d in GAMMA_DUTY])
+
+set_rgb = led_rgb.init(LED_PINS, COMMON_ANODE, lut=GAMMA_DUTY)
+
+# Orbit intensity over one orbit, as Q15 for calculate_interaction.
+# Indexed by an integer phase 0-255; varies between 0.2 (Far/Aphelion) and
+# 1.0 (Close/Perihelion) along a sine wave, so the loop needs no math.sin.
+ORBIT_STEPS = 256
+ORBIT_IQ = array.array('H', [
+    int((0.2 + 0.8 * (math.sin(2 * math.pi * i / ORBIT_STEPS) + 1) / 2) * 32768)
+    for i in range(ORBIT_STEPS)])
+LOW_IQ = int(0.3 * 32768) # Below this the star is dim enough to switch targets
 
 # --- Main Simulation Loop ---
 
@@ -138,37 +152,34 @@ def run_cosmic_loop(lcd, joy_x_pin):
     lcd.clear()
     
     # Initial State
-    current_star = random.choice(STARS)
-    current_planet = random.choice(PLANETS)
+    current_star = random.choice(STAR_TABLE)
+    current_planet = random.choice(PLANET_TABLE)
     
     # Animation Variables
-    t = 0
-    orbit_speed = 0.05
+    phase = 0 # Index into ORBIT_IQ
+    orbit_speed = 2 # Phase steps per tick (~6.4 s per orbit)
     transition_timer = 0
     TRANSITION_INTERVAL = 200 # Cycles before switching targets
+    lcd_ctr = 0
+    LCD_INTERVAL = 20 # Ticks between LCD refreshes
     
-    while True:
+    def tick(timer):
+        nonlocal phase, transition_timer, current_star, current_planet, lcd_ctr
+        
         # 1. Physics Calculations
-        star_name, star_temp = current_star
+        # (Star's Base Color and Wien's Peak Wavelength come from STAR_TABLE)
+        star_name, star_temp, star_rgb, peak_nm = current_star
         planet_name, planet_atm = current_planet
         
-        # Calculate Star's Base Color (Blackbody)
-        star_rgb = kelvin_to_rgb(star_temp)
-        
-        # Calculate Wien's Peak Wavelength
-        peak_nm = wiens_displacement(star_temp)
-        
-        # 2. Orbit Simulation (Sine Wave Distance)
-        # Intensity varies between 0.2 (Far/Aphelion) and 1.0 (Close/Perihelion)
-        orbit_pos = (math.sin(t) + 1) / 2 # 0.0 to 1.0
-        intensity = 0.2 + (orbit_pos * 0.8)
+        # 2. Orbit Simulation (Sine Wave Distance, from the table)
+        iq = ORBIT_IQ[phase]
         
         # 3. Determine Final Color
-        final_rgb = calculate_interaction(star_rgb, planet_atm, intensity)
-        set_rgb(*final_rgb)
+        final_rgb = calculate_interaction(star_rgb, planet_atm, iq)
+        set_rgb(final_rgb >> 16, (final_rgb >> 8) & 0xFF, final_rgb & 0xFF)
         
         # 4. Update LCD (Only every 20 ticks to reduce flicker)
-        if t % 5 < 0.1: # Approximate check
+        if lcd_ctr == 0:
             lcd.move_to(0,0)
             # Row 1: "Sun->Earth"
             s_name = star_name[:7] # Truncate for space
@@ -177,28 +188,39 @@ def run_cosmic_loop(lcd, joy_x_pin):
             
             lcd.move_to(0,1)
             # Row 2: "5778K w:501nm"
-            lcd.putstr(f"{star_temp}K w:{int(peak_nm)}nm  ")
+            lcd.putstr(f"{star_temp}K w:{peak_nm}nm  ")
+
+        lcd_ctr += 1
+        if lcd_ctr >= LCD_INTERVAL:
+            lcd_ctr = 0
 
         # 5. Logic Updates
-        t += orbit_speed
+        phase = (phase + orbit_speed) & (ORBIT_STEPS - 1)
         transition_timer += 1
         
         # Switch targets smoothly? 
         # For now, we do a hard cut logic, but the sine wave makes it feel like a "fade out/in"
         # if we switch when intensity is low.
-        if transition_timer > TRANSITION_INTERVAL and intensity < 0.3:
-            current_star = random.choice(STARS)
-            current_planet = random.choice(PLANETS)
+        if transition_timer > TRANSITION_INTERVAL and iq < LOW_IQ:
+            current_star = random.choice(STAR_TABLE)
+            current_planet = random.choice(PLANET_TABLE)
             transition_timer = 0
-            # Clear line to prevent text artifacts
-            lcd.clear() 
-
-        # 6. Exit Check
-        if joy_x_pin.read_u16() < 20000:
-            set_rgb(0,0,0)
+            # Clear line to prevent text artifacts, redraw on the next tick
             lcd.clear()
-            lcd.putstr("Exiting Cosmos...")
-            utime.sleep(1)
-            return
-
-        utime.sleep_ms(50)
+            lcd_ctr = 0
+    
+    # Frames run from a 50 ms hardware timer; this thread only waits for
+    # the joystick, sleeping in between
+    timer = Timer(-1)
+    timer.init(period=50, mode=Timer.PERIODIC, callback=tick)
+    try:
+        # 6. Exit Check
+        while joy_x_pin.read_u16() >= 20000:
+            utime.sleep_ms(100)
+    finally:
+        timer.deinit()
+    
+    set_rgb(0,0,0)
+    lcd.clear()
+    lcd.putstr("Exiting Cosmos...")
+    utime.sleep(1)
@@ -12,18 +12,29 @@
 import machine
 import utime
 import math
+import array
+import micropython
+from micropython import const
+import led_rgb
 
 # --- HARDWARE PINS (for standalone testing only) ---
 R_PIN = 13
 G_PIN = 14
 B_PIN = 15
+LED_PINS = (R_PIN, G_PIN, B_PIN)
 JOY_BUTTON_PIN = 22
 JOY_X_PIN = 26
 JOY_Y_PIN = 27
 
 # --- CONFIGURATION (Tune These!) ---
-# Physics (Slow, Bouncy, Visible)
-PHYSICS_PARAMS = {'mass': 1.0, 'stiffness': 15.0, 'damping': 0.25}
+# Physics (Slow, Bouncy, Visible): (mass, stiffness, damping)
+PHYSICS_PARAMS = (1.0, 15.0, 0.25)
+# Per-channel (R, G, B) multipliers on PHYSICS_PARAMS for a rich effect
+CHANNEL_MULTS = (
+    (1.0, 1.0, 1.0),
+    (0.9, 0.8, 1.1),
+    (1.1, 1.2, 0.9),
+)
 
 # Pluck Force
 PLUCK_FORCE = 700.0
@@ -33,17 +44,12 @@ JOY_EXIT_THRESHOLD = 10000  # Value for "joystick left"
 JOY_Y_DEAD_ZONE = 5000     # Tolerance for Y-axis center
 DEBOUNCE_MS = 200
 
-# --- HELPER FUNCTIONS ---
+# Fixed physics timestep, paced by a deadline rather than a fixed sleep
+DT_US = const(5000)
+DT = DT_US / 1_000_000
+INPUT_EVERY = const(8) # Physics steps per joystick poll (power of two)
 
-def set_led_color(pwm_pins, r, g, b):
-    """Sets the RGB LED color, handling common anode inversion."""
-    r = max(0, min(255, int(r)))
-    g = max(0, min(255, int(g)))
-    b = max(0, min(255, int(b)))
-    
-    pwm_pins['red'].duty_u16(65535 - (r * 257))
-    pwm_pins['green'].duty_u16(65535 - (g * 257))
-    pwm_pins['blue'].duty_u16(65535 - (b * 257))
+# --- HELPER FUNCTIONS ---
 
 def hsv_to_rgb(h, s, v):
     """Convert HSV (all 0.0-1.0) to RGB (all 0-255)."""
@@ -76,31 +82,97 @@ def hsv_to_rgb(h, s, v):
     else:
         return (v, p, q)
 
+# Rest colors for every 8-bit hue at the app's fixed S=1.0, V=0.1 (dim), as
+# flat (r, g, b) bytes, so joystick hue changes need no float math
+REST_VALUE = 0.1
+_HUE_LUT = bytearray(256 * 3)
+for _h8 in range(256):
+    _HUE_LUT[_h8 * 3:_h8 * 3 + 3] = bytes(hsv_to_rgb(_h8 / 256, 1.0, REST_VALUE))
+del _h8
+
 # --- PHYSICS CLASS ---
 
-class Oscillator:
-    """Simulates a single 1D damped harmonic oscillator."""
-    def __init__(self, mass, stiffness, damping, rest_position):
-        self.mass = mass
-        self.k = stiffness
-        self.c = damping
-        self.rest_pos = rest_position
-        self.pos = rest_position
-        self.vel = 0.0
-        self.accel = 0.0
-
-    def update(self, dt):
-        """Update the oscillator's state using Euler integration."""
-        if dt <= 0: return
-        force_spring = -self.k * (self.pos - self.rest_pos)
-        force_damping = -self.c * self.vel
-        self.accel = (force_spring + force_damping) / self.mass
-        self.vel += self.accel * dt
-        self.pos += self.vel * dt
+# All three oscillators (R, G, B lanes) live in one array('i'), one field
+# after another (structure of arrays): lane i of field F is state[F + i].
+# pos/vel/rest are Q16.16 (color units, units/s). With a fixed timestep the
+# spring and damping terms fold into per-step gains a1 = -(k/m)*dt and
+# a2 = -(c/m)*dt, stored in Q16 and multiplied with Q8 displacement/velocity
+# so the products stay inside 32 bits.
+LANES = const(3)
+S_POS = const(0)
+S_VEL = const(3)
+S_REST = const(6)
+S_A1 = const(9)
+S_A2 = const(12)
+STATE_LEN = const(15)
+MAX_DIFF_Q8 = const(1 << 18) # Displacement clamp (1024 units) keeping a1 * diff in range
+
+@micropython.viper
+def update_all(state, dt: int):
+    """
+    One fixed-point semi-implicit (symplectic) Euler step for every lane;
+    dt is the bound timestep in Q16 seconds.
+    """
+    s = ptr32(state)
+    i = 0
+    while i < LANES:
+        diff = (s[S_POS + i] - s[S_REST + i]) >> 8 # Q8
+        if diff > MAX_DIFF_Q8: diff = MAX_DIFF_Q8
+        if diff < -MAX_DIFF_Q8: diff = -MAX_DIFF_Q8
+        # Velocity first, then position from the *new* velocity: same cost as
+        # explicit Euler but doesn't pump energy into the spring
+        vel = s[S_VEL + i] + ((s[S_A1 + i] * diff + s[S_A2 + i] * (s[S_VEL + i] >> 8)) >> 8)
+        s[S_VEL + i] = vel
+        s[S_POS + i] = s[S_POS + i] + (((vel >> 8) * dt) >> 8)
+        i += 1
+
+@micropython.viper
+def tick(state, cfg, dt: int):
+    """
+    The whole per-frame body: steps every lane, then writes the positions to
+    the LED's PWM registers (cfg from led_rgb.lut_cfg, which clamps them).
+    """
+    update_all(state, dt)
+    s = ptr32(state)
+    led_rgb.write_rgb_lut(cfg, s[S_POS] >> 16, s[S_POS + 1] >> 16, s[S_POS + 2] >> 16)
+
+class Oscillators:
+    """Simulates the R, G and B damped harmonic oscillators in fixed point."""
+    def __init__(self, lanes, dt):
+        # lanes: one (mass, stiffness, damping) per channel
+        self.state = array.array('i', [0] * STATE_LEN)
+        self.inv_mass = [1.0 / mass for mass, _, _ in lanes]
+        self.w2 = [stiffness / mass for mass, stiffness, _ in lanes]
+        self.cm = [damping / mass for mass, _, damping in lanes]
+        self.bind_dt(dt)
+
+    def bind_dt(self, dt):
+        """Precomputes the per-step gains for a fixed timestep of dt seconds."""
+        self.dt_q16 = int(dt * 65536 + 0.5)
+        for i in range(LANES):
+            self.state[S_A1 + i] = -int(self.w2[i] * dt * 65536 + 0.5)
+            self.state[S_A2 + i] = -int(self.cm[i] * dt * 65536 + 0.5)
+
+    def set_rest(self, r, g, b):
+        s = self.state
+        s[S_REST] = int(r) << 16
+        s[S_REST + 1] = int(g) << 16
+        s[S_REST + 2] = int(b) << 16
+
+    def positions(self):
+        """Current (r, g, b) positions as integer color values."""
+        s = self.state
+        return s[S_POS] >> 16, s[S_POS + 1] >> 16, s[S_POS + 2] >> 16
+
+    def update(self):
+        """Steps all lanes by the bound timestep."""
+        update_all(self.state, self.dt_q16)
         
     def pluck(self, force):
-        """Applies an instantaneous force."""
-        self.vel += force / self.mass
+        """Applies an instantaneous force to every lane."""
+        s = self.state
+        for i in range(LANES):
+            s[S_VEL + i] += int(force * self.inv_mass[i] * 65536)
 
 # --- MAIN APPLICATION ---
 
@@ -110,77 +182,87 @@ def run_harmonic_app(joy_x, joy_y, joy_button):
     print("Starting Harmonic LED App...")
     
     # --- Hardware Setup (for this app) ---
-    # We initialize the PWM objects here, assuming they are not
-    # already initialized. If they are, you could pass them in.
-    pwm_pins = {
-        'red': machine.PWM(machine.Pin(R_PIN)),
-        'green': machine.PWM(machine.Pin(G_PIN)),
-        'blue': machine.PWM(machine.Pin(B_PIN))
-    }
-    for pin in pwm_pins.values():
-        pin.freq(1000)
+    # The shared led_rgb driver owns the PWM objects (common anode LED).
+    # cfg is its register buffer (CC addresses + a table scaled to the
+    # slices' TOP), so the viper tick can write the LED itself. It is None
+    # only off the RP2040 (or if the slices run different TOPs), where
+    # set_rgb is used instead.
+    set_rgb = led_rgb.init(LED_PINS, common_anode=True)
+    cfg = led_rgb.lut_cfg(LED_PINS, common_anode=True)
 
     # --- Initialize Physics ---
     # We'll use slightly different physics for each channel for a rich effect
-    r_osc = Oscillator(PHYSICS_PARAMS['mass'] * 1.0, PHYSICS_PARAMS['stiffness'] * 1.0, PHYSICS_PARAMS['damping'] * 1.0, 0)
-    g_osc = Oscillator(PHYSICS_PARAMS['mass'] * 0.9, PHYSICS_PARAMS['stiffness'] * 0.8, PHYSICS_PARAMS['damping'] * 1.1, 0)
-    b_osc = Oscillator(PHYSICS_PARAMS['mass'] * 1.1, PHYSICS_PARAMS['stiffness'] * 1.2, PHYSICS_PARAMS['damping'] * 0.9, 0)
+    mass, stiffness, damping = PHYSICS_PARAMS
+    osc = Oscillators([(mass * mm, stiffness * km, damping * cm)
+                       for mm, km, cm in CHANNEL_MULTS], DT)
     
     last_pluck_time = -5000
-    last_time_us = utime.ticks_us()
-    current_hue = 0.0
+    hue8 = 0 # Current hue, 0-255
     
     # Set initial dim color
-    rest_r, rest_g, rest_b = hsv_to_rgb(current_hue, 1.0, 0.1) # Start at dim red
-    r_osc.rest_pos, g_osc.rest_pos, b_osc.rest_pos = rest_r, rest_g, rest_b
+    osc.set_rest(_HUE_LUT[0], _HUE_LUT[1], _HUE_LUT[2]) # Start at dim red
+    
+    # Bind everything the loop calls to locals (no global/attribute lookups)
+    _tick = tick
+    _state = osc.state
+    _dt = osc.dt_q16
+    _read_x = joy_x.read_u16
+    _read_y = joy_y.read_u16
+    _btn = joy_button.value
+    _ticks_us = utime.ticks_us
+    _ticks_ms = utime.ticks_ms
+    _diff = utime.ticks_diff
+    _sleep_us = utime.sleep_us
+    _pace = led_rgb.pace
+    _update = osc.update
+    _positions = osc.positions
+    
+    next_us = utime.ticks_add(_ticks_us(), DT_US)
+    frame = 0
     
     while True:
-        current_time_us = utime.ticks_us()
-        dt = utime.ticks_diff(current_time_us, last_time_us) / 1_000_000.0
-        last_time_us = current_time_us
-        
-        # --- 1. Check for Exit (Joystick Left) ---
-        if joy_x.read_u16() < JOY_EXIT_THRESHOLD:
-            print("Exiting Harmonic App...")
-            set_led_color(pwm_pins, 0, 0, 0)
-            # De-init PWM pins to free them up
-            for pin in pwm_pins.values():
-                pin.deinit()
-            utime.sleep(0.5)
-            return  # Exit the function
-
-        # --- 2. Check for Pluck (Joystick Button) ---
-        current_ms = utime.ticks_ms()
-        if joy_button.value() == 1 and utime.ticks_diff(current_ms, last_pluck_time) > DEBOUNCE_MS:
-            print(f"Pluck! at Hue: {current_hue:.2f}")
-            last_pluck_time = current_ms
-            r_osc.pluck(PLUCK_FORCE)
-            g_osc.pluck(PLUCK_FORCE)
-            b_osc.pluck(PLUCK_FORCE)
-            
-        # --- 3. Check for Hue Change (Joystick Y-Axis) ---
-        y_val = joy_y.read_u16()
-        # Check if outside the dead zone
-        if y_val > (32768 + JOY_Y_DEAD_ZONE) or y_val < (32768 - JOY_Y_DEAD_ZONE):
-            # Map Y value (0-65535) to hue (0.0-1.0)
-            current_hue = y_val / 65535.0
+        # Inputs are sampled every INPUT_EVERY steps (~40 ms): fast enough
+        # for a hand, without an ADC read on every physics step
+        frame = (frame + 1) & (INPUT_EVERY - 1)
+        if frame == 0:
+            # --- 1. Check for Exit (Joystick Left) ---
+            if _read_x() < JOY_EXIT_THRESHOLD:
+                print("Exiting Harmonic App...")
+                set_rgb(0, 0, 0)
+                # De-init PWM pins to free them up
+                led_rgb.deinit(LED_PINS)
+                utime.sleep(0.5)
+                return  # Exit the function
+
+            # --- 2. Check for Pluck (Joystick Button) ---
+            current_ms = _ticks_ms()
+            if _btn() == 1 and _diff(current_ms, last_pluck_time) > DEBOUNCE_MS:
+                print(f"Pluck! at Hue: {hue8 / 256:.2f}")
+                last_pluck_time = current_ms
+                osc.pluck(PLUCK_FORCE)
             
-            # Set the "rest" position to this new hue, but keep it dim (Value=0.1)
-            # The "pos" will oscillate around this, but will settle back here.
-            rest_r, rest_g, rest_b = hsv_to_rgb(current_hue, 1.0, 0.1)
-            r_osc.rest_pos = rest_r
-            g_osc.rest_pos = rest_g
-            b_osc.rest_pos = rest_b
+            # --- 3. Check for Hue Change (Joystick Y-Axis) ---
+            y_val = _read_y()
+            # Check if outside the dead zone
+            if y_val > (32768 + JOY_Y_DEAD_ZONE) or y_val < (32768 - JOY_Y_DEAD_ZONE):
+                # Map Y value (0-65535) to an 8-bit hue
+                hue8 = y_val >> 8
             
-        # --- 4. Update Physics ---
-        r_osc.update(dt)
-        g_osc.update(dt)
-        b_osc.update(dt)
-        
-        # --- 5. Update LED ---
-        set_led_color(pwm_pins, r_osc.pos, g_osc.pos, b_osc.pos)
+                # Set the "rest" position to this new hue, but keep it dim (Value=0.1)
+                # The "pos" will oscillate around this, but will settle back here.
+                idx = hue8 * 3
+                osc.set_rest(_HUE_LUT[idx], _HUE_LUT[idx + 1], _HUE_LUT[idx + 2])
+
+        # --- 4/5. Update Physics and LED ---
+        if cfg is not None:
+            _tick(_state, cfg, _dt)
+        else:
+            _update()
+            r, g, b = _positions()
+            set_rgb(r, g, b)
         
-        utime.sleep_ms(5)
+        # --- 6. Wait for the next step's deadline ---
+        next_us = _pace(next_us, DT_US, _ticks_us, _sleep_us)
 
 # --- Standalone Testing Block ---
 # This code only runs if you run this file directly.
@@ -199,8 +281,4 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"An error occurred: {e}")
         # Clean up on error
-        set_led_color({
-            'red': machine.PWM(machine.Pin(R_PIN)),
-            'green': machine.PWM(machine.Pin(G_PIN)),
-            'blue': machine.PWM(machine.Pin(B_PIN))
-        }, 0, 0, 0)
+        led_rgb.init(LED_PINS, common_anode=True)(0, 0, 0)
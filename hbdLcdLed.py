@@ -1,4 +1,4 @@
-from machine import Pin, I2C
+from machine import Pin, I2C, Timer, mem32
 from utime import sleep
 from pico_i2c_lcd import I2cLcd
 import random
@@ -20,12 +20,32 @@ PIN_RED = Pin(16, Pin.OUT)
 PIN_GREEN = Pin(17, Pin.OUT)
 PIN_BLUE = Pin(18, Pin.OUT)
 
-# Function to set RGB LED color
+# RP2040 SIO registers: writing a bit mask sets/clears those GPIO outputs
+# in one store. R, G, B must stay on consecutive pins starting at LED_SHIFT.
+SIO_GPIO_OUT_SET = 0xD0000014
+SIO_GPIO_OUT_CLR = 0xD0000018
+LED_SHIFT = 16
+
+# Function to set RGB LED color; r, g, b are 1 = lit, 0 = dark
 def set_color(r, g, b):
-    # Common Anode logic: 0 = on, 1 = off
-    PIN_RED.value(1 - r)
-    PIN_GREEN.value(1 - g)
-    PIN_BLUE.value(1 - b)
+    # Common Anode logic: a low pin is on, a high pin is off, so the lit
+    # channels are cleared (driven low) and the dark ones set (driven high)
+    on = r | (g << 1) | (b << 2)
+    mem32[SIO_GPIO_OUT_CLR] = on << LED_SHIFT
+    mem32[SIO_GPIO_OUT_SET] = (on ^ 7) << LED_SHIFT
+
+# LED animation, run from a periodic timer so the main thread only
+# handles the LCD and otherwise sleeps. Allocates nothing per call.
+def animate_led(timer):
+    # One PRNG call gives all three on/off bits
+    rgb = random.getrandbits(3)
+    set_color(rgb & 1, (rgb >> 1) & 1, (rgb >> 2) & 1)
+
+FRAME_MS = 100     # Short delay for a cool effect
+MESSAGE_SECONDS = 3 # How long each message shows while the LED plays
+
+led_timer = Timer(-1)
+led_timer.init(period=FRAME_MS, mode=Timer.PERIODIC, callback=animate_led)
 
 # Main loop
 try:
@@ -36,14 +56,7 @@ try:
         lcd.putstr("It's your")
         lcd.move_to(4, 1)
         lcd.putstr("Birthday")
-        
-        # Animate the LED
-        for _ in range(30):  # Play the effect for a few seconds
-            r = random.randint(0, 1)
-            g = random.randint(0, 1)
-            b = random.randint(0, 1)
-            set_color(r, g, b)
-            sleep(0.1) # Short delay for a cool effect
+        sleep(MESSAGE_SECONDS)
 
         # Display second message
         lcd.clear()
@@ -51,17 +64,11 @@ try:
         lcd.putstr("Brittany")
         lcd.move_to(6, 1)
         lcd.putstr("Long")
-
-        # Animate the LED again
-        for _ in range(30):  # Play the effect for a few seconds
-            r = random.randint(0, 1)
-            g = random.randint(0, 1)
-            b = random.randint(0, 1)
-            set_color(r, g, b)
-            sleep(0.1)
+        sleep(MESSAGE_SECONDS)
             
 except KeyboardInterrupt:
     print("Script stopped.")
+    led_timer.deinit()
     lcd.clear()
-    set_color(1, 1, 1)  # Turn off the LED
-    
+    # set_color takes 1 = lit, so all zeros drives every pin high: LED off
+    set_color(0, 0, 0)
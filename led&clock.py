@@ -2,8 +2,9 @@ import time
 import network
 import ntptime
 import random
-from machine import Pin, I2C, PWM
+from machine import Pin, I2C
 from lcd_i2c import I2cLcd
+import led_rgb
 
 # --- User-configurable variables ---
 # WiFi credentials for time sync. Update these with your network's details.
@@ -21,18 +22,8 @@ B_PIN = 18
 
 # --- Hardware Initialization ---
 # RGB LED (Common Anode logic: on=0, off=65535)
-pwm_r = PWM(Pin(R_PIN))
-pwm_g = PWM(Pin(G_PIN))
-pwm_b = PWM(Pin(B_PIN))
-pwm_r.freq(1000)
-pwm_g.freq(1000)
-pwm_b.freq(1000)
-
-def set_rgb_color(r, g, b):
-    # Convert 0-255 values to 65535-0 PWM duty cycles for common anode
-    pwm_r.duty_u16(65535 - int(r * 65535 / 255))
-    pwm_g.duty_u16(65535 - int(g * 65535 / 255))
-    pwm_b.duty_u16(65535 - int(b * 65535 / 255))
+# 0-255 values go through led_rgb's precomputed inverted duty table
+set_rgb_color = led_rgb.init((R_PIN, G_PIN, B_PIN), common_anode=True)
 
 # LCD1602 Display
 i2c = I2C(0, sda=Pin(I2C_SDA_PIN), scl=Pin(I2C_SCL_PIN), freq=400000)
@@ -43,6 +34,38 @@ if len(devices) == 0:
 lcd_address = devices[0]
 lcd = I2cLcd(i2c, lcd_address, 2, 16)
 
+# --- Batched LCD Writes ---
+# putstr sends every nibble as its own I2C transaction. lcd_write_at
+# encodes the cursor move and all characters in PCF8574 form (4 bytes per
+# HD44780 byte: high nibble with E high/low, then the low nibble) and sends
+# them in one writeto(). At 400 kHz each byte takes ~22 us, which already
+# covers the LCD's ~37 us per-character execution time.
+LCD_MASK_RS = 0x01
+LCD_MASK_E = 0x04
+LCD_SHIFT_BACKLIGHT = 3
+LCD_SHIFT_DATA = 4
+LCD_ROW_CMD = (0x80, 0xC0) # Set DDRAM address to the start of row 0 / row 1
+
+def _lcd_encode(buf, i, value, flags):
+    """Stores the 4-byte E-strobed nibble sequence for one LCD byte at buf[i]."""
+    hi = flags | ((value >> 4) << LCD_SHIFT_DATA)
+    lo = flags | ((value & 0x0F) << LCD_SHIFT_DATA)
+    buf[i] = hi | LCD_MASK_E
+    buf[i + 1] = hi
+    buf[i + 2] = lo | LCD_MASK_E
+    buf[i + 3] = lo
+
+def lcd_write_at(col, row, text):
+    """Writes text at (col, row) in a single I2C transaction."""
+    bl = lcd.backlight << LCD_SHIFT_BACKLIGHT
+    buf = bytearray(4 * (len(text) + 1))
+    _lcd_encode(buf, 0, LCD_ROW_CMD[row] | col, bl)
+    i = 4
+    for ch in text:
+        _lcd_encode(buf, i, ord(ch), bl | LCD_MASK_RS)
+        i += 4
+    i2c.writeto(lcd_address, buf)
+
 # --- Network and Time Sync ---
 wlan = network.WLAN(network.STA_IF)
 wlan.active(True)
@@ -68,6 +91,17 @@ if not wlan.isconnected():
     print("Could not connect to WiFi. Using fallback time.")
     
 # --- Main Program Loop ---
+# Zero-padded "00".."59" built once, so the per-second update formats nothing
+_TWO = tuple("%02d" % i for i in range(60))
+
+# The display is cleared once; after that only fields that changed are
+# rewritten in place (HH at col 0, MM at col 3, SS at col 6, date on row 1).
+lcd.clear()
+lcd_write_at(0, 0, "  :  :  ")
+prev_hour = -1
+prev_minute = -1
+prev_day = -1
+
 while True:
     # 1. Update RGB LED with a new random color
     r = random.randint(0, 255)
@@ -81,16 +115,17 @@ while True:
     minute = current_time[4]
     second = current_time[5]
     
-    # Format the time (HH:MM:SS)
-    time_string = f"{hour:02d}:{minute:02d}:{second:02d}"
+    if hour != prev_hour:
+        lcd_write_at(0, 0, _TWO[hour])
+        prev_hour = hour
+    if minute != prev_minute:
+        lcd_write_at(3, 0, _TWO[minute])
+        prev_minute = minute
+    lcd_write_at(6, 0, _TWO[second])
     
-    # Format the date (YYYY-MM-DD)
-    date_string = f"{current_time[0]}-{current_time[1]:02d}-{current_time[2]:02d}"
-
-    lcd.clear()
-    lcd.move_to(0, 0)
-    lcd.putstr(time_string)
-    lcd.move_to(0, 1)
-    lcd.putstr(date_string)
+    # Format the date (YYYY-MM-DD), only when the day changes
+    if current_time[2] != prev_day:
+        lcd_write_at(0, 1, str(current_time[0]) + "-" + _TWO[current_time[1]] + "-" + _TWO[current_time[2]])
+        prev_day = current_time[2]
 
     time.sleep(1) # Wait 1 second before the next loop
@@ -2,25 +2,21 @@
 # A standalone MicroPython script to demonstrate color transitions
 # based on physical system responses (control theory).
 
-import machine
 import utime
 import math
+import led_rgb
 
 # --- HARDWARE SETUP (Common Anode RGB LED) ---
 # Connect R, G, B pins to GPIOs, and the common anode to 3.3V.
 # NOTE: For common anode, a 0% duty cycle is full brightness.
-# We will handle this inversion in the set_led_color function.
+# The inversion is baked into set_led_color's duty table.
 R_PIN = 13
 G_PIN = 14
 B_PIN = 15
 
-# Initialize PWM for each color channel
-red = machine.PWM(machine.Pin(R_PIN))
-green = machine.PWM(machine.Pin(G_PIN))
-blue = machine.PWM(machine.Pin(B_PIN))
-red.freq(1000)
-green.freq(1000)
-blue.freq(1000)
+# set_led_color(r, g, b) takes 0-255 (floats are truncated, out-of-range
+# values clamped) and writes the three channels through a precomputed table
+set_led_color = led_rgb.init((R_PIN, G_PIN, B_PIN), common_anode=True, freq=1000)
 
 # --- CONFIGURATION ---
 # Change these colors to experiment!
@@ -41,92 +37,124 @@ DAMPED_OMEGA_N = 1.5  # Natural frequency. Higher = faster response.
 BOUNCY_OMEGA_N = 10.0 # Natural frequency. Higher = faster, tighter bounces.
 BOUNCY_ZETA = 0.15    # Damping ratio. Lower = more bouncy, higher = less bouncy.
 
-# --- HELPER FUNCTIONS ---
-
-def set_led_color(r, g, b):
-    """Sets the RGB LED color, handling common anode inversion."""
-    # Clamp values to the valid 0-255 range
-    r = max(0, min(255, int(r)))
-    g = max(0, min(255, int(g)))
-    b = max(0, min(255, int(b)))
-    
-    # Invert for common anode and scale to 16-bit duty cycle (0-65535)
-    red.duty_u16(65535 - (r * 257))
-    green.duty_u16(65535 - (g * 257))
-    blue.duty_u16(65535 - (b * 257))
-
-def lerp(a, b, t):
-    """Linear interpolation between 'a' and 'b' by factor 't'."""
-    return a + (b - a) * t
-
-# --- EASING FUNCTIONS (The Core Behavior Math) ---
-
-def linear_ease(t_norm):
-    """The most basic transition. A straight line."""
-    return t_norm
-
-def damped_ease(t_norm):
-    """Models a critically damped system (like a smooth, heavy door).
-    It reaches the target value as fast as possible without overshooting."""
-    # We scale t_norm to get a better visual effect over the duration
-    t = t_norm * 5 
-    omega_n = DAMPED_OMEGA_N
-    # Equation for critically damped second-order system response
-    return 1 - (1 + omega_n * t) * math.exp(-omega_n * t)
-
-def bouncy_ease(t_norm):
-    """Models an underdamped system (bouncy spring, resonant circuit).
-    It overshoots the target and oscillates before settling."""
-    # We scale t_norm to get a good number of bounces
-    t = t_norm * 8 
-    zeta = BOUNCY_ZETA
-    omega_n = BOUNCY_OMEGA_N
-    omega_d = omega_n * math.sqrt(1 - zeta**2) # Damped frequency
-    
-    # Equation for underdamped second-order system response
-    e_term = math.exp(-zeta * omega_n * t)
-    cos_term = math.cos(omega_d * t)
-    sin_term = (zeta * omega_n / omega_d) * math.sin(omega_d * t)
-    
-    return 1 - e_term * (cos_term + sin_term)
-
+# Derived once so the BOUNCY curve doesn't redo the sqrt and divide every frame
+BOUNCY_OMEGA_D = BOUNCY_OMEGA_N * math.sqrt(1 - BOUNCY_ZETA**2) # Damped frequency
+BOUNCY_SIN_K = BOUNCY_ZETA * BOUNCY_OMEGA_N / BOUNCY_OMEGA_D
+BOUNCY_DECAY = BOUNCY_ZETA * BOUNCY_OMEGA_N
+# Highest progress the BOUNCY curve reaches (its first overshoot peak); it
+# never dips below 0, so its progress stays within [0, BOUNCY_PEAK]
+BOUNCY_PEAK = 1 + math.exp(-BOUNCY_ZETA * math.pi / math.sqrt(1 - BOUNCY_ZETA**2))
+
+# Frame period of the transition playback
+FRAME_MS = 10
+
+# --- EASING KINDS (The Core Behavior Math) ---
+# Picked by number so the transition builder evaluates the formulas inline
+# instead of making a Python call per frame.
+LINEAR = 0  # The most basic transition. A straight line.
+DAMPED = 1  # A critically damped system (like a smooth, heavy door).
+            # It reaches the target value as fast as possible without overshooting.
+BOUNCY = 2  # An underdamped system (bouncy spring, resonant circuit).
+            # It overshoots the target and oscillates before settling.
 
 # --- MAIN TRANSITION CONTROLLER ---
 
-def run_transition(start_rgb, end_rgb, duration_s, easing_function):
+def precompute_transition(start_rgb, end_rgb, n, kind):
+    """
+    Evaluates the easing curve of the given kind once per frame and returns
+    the n colors as a bytearray of r, g, b bytes.
+    """
+    frames = bytearray(3 * n)
+    last = n - 1 if n > 1 else 1
+    r0, g0, b0 = start_rgb
+    dr = end_rgb[0] - r0
+    dg = end_rgb[1] - g0
+    db = end_rgb[2] - b0
+    # LINEAR and DAMPED progress stays in [0, 1], so each channel stays
+    # between its endpoints. Only BOUNCY's overshoot can leave 0-255, which is
+    # checked once here from its peak; the per-frame clamp runs only then.
+    clamp = False
+    if kind == BOUNCY:
+        for c0, d in ((r0, dr), (g0, dg), (b0, db)):
+            v = c0 + d * BOUNCY_PEAK
+            if v < 0 or v >= 256:
+                clamp = True
+    # t advances by a fixed step per frame, so the exp/cos/sin terms are
+    # stepped by multiplication (exp(-a(t+h)) = exp(-at) * exp(-ah), and
+    # cos/sin by a rotation) instead of being recomputed every frame
+    if kind == BOUNCY:
+        # We scale t_norm to get a good number of bounces
+        h = 8 / last
+        decay = math.exp(-BOUNCY_DECAY * h)
+        rot_c = math.cos(BOUNCY_OMEGA_D * h)
+        rot_s = math.sin(BOUNCY_OMEGA_D * h)
+        sin_k = BOUNCY_SIN_K
+    else:
+        # We scale t_norm to get a better visual effect over the duration
+        h = DAMPED_OMEGA_N * 5 / last
+        decay = math.exp(-h)
+    e_term = 1.0
+    cos_t = 1.0
+    sin_t = 0.0
+    wt = 0.0
+    for i in range(n):
+        if kind == BOUNCY:
+            # Equation for underdamped second-order system response
+            p = 1 - e_term * (cos_t + sin_k * sin_t)
+            e_term *= decay
+            cos_t, sin_t = cos_t * rot_c - sin_t * rot_s, sin_t * rot_c + cos_t * rot_s
+        elif kind == DAMPED:
+            # Equation for critically damped second-order system response
+            p = 1 - (1 + wt) * e_term
+            e_term *= decay
+            wt += h
+        else:
+            p = i / last
+        r = int(r0 + dr * p)
+        g = int(g0 + dg * p)
+        b = int(b0 + db * p)
+        if clamp:
+            r = 0 if r < 0 else 255 if r > 255 else r
+            g = 0 if g < 0 else 255 if g > 255 else g
+            b = 0 if b < 0 else 255 if b > 255 else b
+        j = 3 * i
+        frames[j] = r
+        frames[j + 1] = g
+        frames[j + 2] = b
+    return frames
+
+def run_transition(start_rgb, end_rgb, duration_s, kind):
     """
-    Handles the color transition over time using a specified easing function.
+    Handles the color transition over time using a specified easing kind.
+    The whole curve is precomputed, so playback is only table reads and PWM
+    writes every FRAME_MS.
     
     Args:
         start_rgb (tuple): The starting (r, g, b) color.
         end_rgb (tuple): The target (r, g, b) color.
         duration_s (float): The total time the transition should take.
-        easing_function (function): The function that defines the transition's curve.
+        kind (int): LINEAR, DAMPED or BOUNCY, the transition's curve.
     """
-    start_time = utime.ticks_ms()
+    n = int(duration_s * 1000) // FRAME_MS
+    frames = precompute_transition(start_rgb, end_rgb, n, kind)
     
-    while True:
-        elapsed_ms = utime.ticks_diff(utime.ticks_ms(), start_time)
-        
-        # Check if the transition is complete
-        if elapsed_ms >= duration_s * 1000:
-            set_led_color(end_rgb[0], end_rgb[1], end_rgb[2])
-            break
-            
-        # Calculate normalized time (a value from 0.0 to 1.0)
-        normalized_time = elapsed_ms / (duration_s * 1000)
-        
-        # Get the progress value from the provided easing function
-        progress = easing_function(normalized_time)
-        
-        # Calculate the current color for each channel using interpolation
-        current_r = lerp(start_rgb[0], end_rgb[0], progress)
-        current_g = lerp(start_rgb[1], end_rgb[1], progress)
-        current_b = lerp(start_rgb[2], end_rgb[2], progress)
-        
-        set_led_color(current_r, current_g, current_b)
-        
-        utime.sleep_ms(10) # Small delay to prevent busy-looping
+    # Only write the LED when the quantized color changes (slow tails repeat)
+    # Frames are paced against deadlines, so the write time doesn't add to FRAME_MS
+    pr = pg = pb = -1
+    next_tick = utime.ticks_add(utime.ticks_ms(), FRAME_MS)
+    for j in range(0, len(frames), 3):
+        r = frames[j]
+        g = frames[j + 1]
+        b = frames[j + 2]
+        if r != pr or g != pg or b != pb:
+            set_led_color(r, g, b)
+            pr = r
+            pg = g
+            pb = b
+        next_tick = led_rgb.pace(next_tick, FRAME_MS)
+    
+    # Land exactly on the target color
+    set_led_color(end_rgb[0], end_rgb[1], end_rgb[2])
 
 # --- MAIN LOOP ---
 
@@ -134,27 +162,27 @@ def main():
     """The main application loop that cycles through the behaviors."""
     
     behaviors = [
-        ("Linear", linear_ease),
-        ("Damped Door", damped_ease),
-        ("Bouncy Spring", bouncy_ease)
+        ("Linear", LINEAR),
+        ("Damped Door", DAMPED),
+        ("Bouncy Spring", BOUNCY)
     ]
     
     current_behavior_index = 0
     
     while True:
-        # Get the current behavior's name and function
-        name, ease_func = behaviors[current_behavior_index]
+        # Get the current behavior's name and easing kind
+        name, kind = behaviors[current_behavior_index]
         
         print(f"--- Starting Transition: {name} ---")
         
         # Run the transition from start to end color
-        run_transition(START_COLOR, END_COLOR, TRANSITION_DURATION_S, ease_func)
+        run_transition(START_COLOR, END_COLOR, TRANSITION_DURATION_S, kind)
         utime.sleep(PAUSE_BETWEEN_MODES_S)
         
         print(f"--- Returning to Start: {name} ---")
         
         # Run the transition from end back to start color
-        run_transition(END_COLOR, START_COLOR, TRANSITION_DURATION_S, ease_func)
+        run_transition(END_COLOR, START_COLOR, TRANSITION_DURATION_S, kind)
         utime.sleep(PAUSE_BETWEEN_MODES_S)
         
         # Move to the next behavior for the next loop
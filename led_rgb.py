@@ -0,0 +1,277 @@
+# led_rgb.py
+# Shared RGB LED driver: PWM setup and the fast set_rgb used by the effects.
+
+import sys
+import utime
+import array
+import micropython
+from micropython import const
+from machine import Pin, PWM, mem32, disable_irq, enable_irq
+
+# --- Defaults ---
+LED_PINS = (16, 17, 18) # R, G, B
+PWM_FREQ = 1000
+
+# PWM objects already set up, keyed by pin, so two effects importing this
+# module share one channel instead of re-initializing it
+_channels = {}
+
+def channels(pins=LED_PINS, freq=PWM_FREQ):
+    """Returns the (r, g, b) PWM objects for the pins, creating them once."""
+    out = []
+    for pin in pins:
+        pwm = _channels.get(pin)
+        if pwm is None:
+            pwm = PWM(Pin(pin))
+            pwm.freq(freq)
+            _channels[pin] = pwm
+        out.append(pwm)
+    return out
+
+def deinit(pins=LED_PINS):
+    """Turns the PWM channels off and forgets them."""
+    for pin in pins:
+        pwm = _channels.pop(pin, None)
+        if pwm is not None:
+            pwm.deinit()
+
+def duty_lut(common_anode=True):
+    """0-255 -> 16-bit duty cycle table, with the common-anode inversion baked in."""
+    if common_anode:
+        return array.array('H', [65535 - (i * 65535) // 255 for i in range(256)])
+    return array.array('H', [(i * 65535) // 255 for i in range(256)])
+
+# --- Direct PWM Register Writes (RP2040) ---
+# Each PWM slice has a CC register holding channel A in bits 0-15 and
+# channel B in bits 16-31, compared against the slice's TOP. PWM.freq()
+# picks TOP (at most 65534) and a fractional divider for the frequency, so
+# TOP varies with freq and clk_sys. duty_u16(d) stores d * (TOP + 1) // 65535;
+# the writers below store the same value themselves, skipping duty_u16().
+# TOP is read when the setter is built, so change freq() only before that.
+PWM_BASE = const(0x40050000)
+PWM_EN = const(0x400500A0) # One enable bit per slice, all switched in one write
+
+# Set False to force the portable duty_u16() path
+FAST_PWM = True
+
+def pwm_cc_reg(pin):
+    """Returns (CC register address, bit shift) for a GPIO's PWM channel."""
+    return PWM_BASE + ((pin >> 1) & 7) * 0x14 + 0x0C, (pin & 1) * 16
+
+def cc_regs(pins):
+    """
+    Returns an array('I') of (address, shift) pairs for the three channels
+    followed by TOP + 1 (the CC value for 100% duty), or None when the fast
+    path can't be used (not an RP2040, or the slices run different TOPs).
+    """
+    if not FAST_PWM or sys.platform != 'rp2':
+        return None
+    regs = array.array('I')
+    for pin in pins:
+        regs.extend(pwm_cc_reg(pin))
+    # TOP sits right after CC; one scale serves all three channels
+    top = mem32[regs[0] + 4] & 0xFFFF
+    for i in range(2, 6, 2):
+        if mem32[regs[i] + 4] & 0xFFFF != top:
+            return None
+    regs.append(top + 1)
+    return regs
+
+def cc_lut(lut, full):
+    """Converts a 256-entry duty_u16 table to CC values for TOP + 1 == full."""
+    return [(d * full) // 65535 for d in lut]
+
+def phase_align(pins):
+    """
+    Restarts the pins' PWM slices from zero in the same clock cycle, so the
+    channels on different slices (B on GP18) stay in step with R and G.
+    """
+    mask = 0
+    for pin in pins:
+        mask |= 1 << ((pin >> 1) & 7)
+    mem32[PWM_EN] = mem32[PWM_EN] & ~mask & 0xFF
+    for i in range(8):
+        if mask & (1 << i):
+            mem32[PWM_BASE + i * 0x14 + 0x08] = 0 # CTR
+    mem32[PWM_EN] = mem32[PWM_EN] | mask
+
+@micropython.viper
+def write_rgb_cc(regs, r: int, g: int, b: int):
+    """
+    Stores three 16-bit duty values straight into their PWM CC registers,
+    scaled to TOP like duty_u16 (regs from cc_regs). Channels that share a
+    slice (R and G on GP16/17) are merged into one store.
+    """
+    p = ptr32(regs)
+    q = p[6]
+    # d * q // 65535 exactly in 31-bit signed math: with x = d * q,
+    # x // 65535 == (x + (x >> 16) + 1) >> 16, evaluated on x / 2 so the
+    # intermediates never reach bit 31
+    h = (r >> 1) * q
+    o = (r & 1) * q
+    t = (h + (o >> 1)) >> 15
+    r = (h + ((o + t + 1) >> 1)) >> 15
+    h = (g >> 1) * q
+    o = (g & 1) * q
+    t = (h + (o >> 1)) >> 15
+    g = (h + ((o + t + 1) >> 1)) >> 15
+    h = (b >> 1) * q
+    o = (b & 1) * q
+    t = (h + (o >> 1)) >> 15
+    b = (h + ((o + t + 1) >> 1)) >> 15
+    a = p[0]
+    s = p[1]
+    cc = ptr32(a)
+    v = (cc[0] & ~(0xFFFF << s)) | (r << s)
+    s = p[3]
+    if p[2] != a:
+        cc[0] = v
+        a = p[2]
+        cc = ptr32(a)
+        v = cc[0]
+    v = (v & ~(0xFFFF << s)) | (g << s)
+    s = p[5]
+    if p[4] != a:
+        cc[0] = v
+        cc = ptr32(p[4])
+        v = cc[0]
+    cc[0] = (v & ~(0xFFFF << s)) | (b << s)
+
+@micropython.viper
+def write_rgb_lut(cfg, r: int, g: int, b: int):
+    """
+    Clamps 0-255 channels, maps them through the CC table and stores them
+    like write_rgb_cc. cfg = array('I', cc_regs(...) + cc_lut(...)).
+    """
+    p = ptr32(cfg)
+    if r < 0: r = 0
+    if r > 255: r = 255
+    if g < 0: g = 0
+    if g > 255: g = 255
+    if b < 0: b = 0
+    if b > 255: b = 255
+    # All three duties are looked up before the first store
+    r = p[7 + r]
+    g = p[7 + g]
+    b = p[7 + b]
+    a = p[0]
+    s = p[1]
+    cc = ptr32(a)
+    v = (cc[0] & ~(0xFFFF << s)) | (r << s)
+    s = p[3]
+    if p[2] != a:
+        cc[0] = v
+        a = p[2]
+        cc = ptr32(a)
+        v = cc[0]
+    v = (v & ~(0xFFFF << s)) | (g << s)
+    s = p[5]
+    if p[4] != a:
+        cc[0] = v
+        cc = ptr32(p[4])
+        v = cc[0]
+    cc[0] = (v & ~(0xFFFF << s)) | (b << s)
+
+def lut_cfg(pins=LED_PINS, common_anode=True, lut=None):
+    """
+    Returns the write_rgb_lut buffer (CC registers + duty table) for viper
+    callers that write the LED themselves, or None off the fast path.
+    The pins must already be set up by channels() or init().
+    """
+    regs = cc_regs(pins)
+    if regs is None:
+        return None
+    if lut is None:
+        lut = duty_lut(common_anode)
+    cfg = array.array('I', regs)
+    cfg.extend(cc_lut(lut, regs[6]))
+    return cfg
+
+def fast_path(pins=LED_PINS):
+    """
+    True if setters built for these (already set up) pins write the CC
+    registers directly; handy from the REPL to confirm it on a board.
+    """
+    return cc_regs(pins) is not None
+
+# --- Setters ---
+
+def init(pins=LED_PINS, common_anode=True, freq=PWM_FREQ, lut=None):
+    """
+    Sets up the LED and returns set_rgb(r, g, b) taking 0-255 values.
+    lut replaces the linear duty table (e.g. a gamma curve); it must be a
+    256-entry array('H') with any common-anode inversion already applied. The
+    three channels are written back to back with interrupts off, so a timer
+    or second core never sees a half-updated color.
+    """
+    pwm_r, pwm_g, pwm_b = channels(pins, freq)
+    if lut is None:
+        lut = duty_lut(common_anode)
+    # Registers and duty table in one buffer so the viper kernel does the
+    # clamp, lookup and stores; int() keeps float callers working
+    cfg = lut_cfg(pins, lut=lut)
+
+    if cfg is not None:
+        phase_align(pins)
+        def set_rgb(r, g, b, _cfg=cfg):
+            r = int(r)
+            g = int(g)
+            b = int(b)
+            irq = disable_irq()
+            write_rgb_lut(_cfg, r, g, b)
+            enable_irq(irq)
+    else:
+        # The table and bound duty_u16 methods are default args so they load as locals
+        def set_rgb(r, g, b, _lut=lut, _r=pwm_r.duty_u16, _g=pwm_g.duty_u16, _b=pwm_b.duty_u16):
+            r = int(r)
+            g = int(g)
+            b = int(b)
+            r = 0 if r < 0 else 255 if r > 255 else r
+            g = 0 if g < 0 else 255 if g > 255 else g
+            b = 0 if b < 0 else 255 if b > 255 else b
+            r = _lut[r]
+            g = _lut[g]
+            b = _lut[b]
+            irq = disable_irq()
+            _r(r)
+            _g(g)
+            _b(b)
+            enable_irq(irq)
+
+    return set_rgb
+
+def init_u16(pins=LED_PINS, freq=PWM_FREQ):
+    """Like init(), but the returned setter takes raw 16-bit duty cycles."""
+    pwm_r, pwm_g, pwm_b = channels(pins, freq)
+    regs = cc_regs(pins)
+
+    if regs is not None:
+        phase_align(pins)
+        def set_rgb_u16(r, g, b, _regs=regs):
+            irq = disable_irq()
+            write_rgb_cc(_regs, r, g, b)
+            enable_irq(irq)
+    else:
+        def set_rgb_u16(r, g, b, _r=pwm_r.duty_u16, _g=pwm_g.duty_u16, _b=pwm_b.duty_u16):
+            irq = disable_irq()
+            _r(r)
+            _g(g)
+            _b(b)
+            enable_irq(irq)
+
+    return set_rgb_u16
+
+# --- Frame Pacing ---
+def pace(deadline, period, ticks=utime.ticks_ms, sleep=utime.sleep_ms):
+    """
+    Sleeps until deadline and returns the next one, period later, so the
+    work done between calls doesn't add to the frame time. Pass ticks_us /
+    sleep_us for microsecond periods. Falling more than 10 periods behind
+    (GC, print) restarts the schedule from now instead of bursting frames.
+    """
+    rem = utime.ticks_diff(deadline, ticks())
+    if rem > 0:
+        sleep(rem)
+    if rem < -10 * period:
+        return utime.ticks_add(ticks(), period)
+    return utime.ticks_add(deadline, period)
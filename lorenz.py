@@ -3,8 +3,7 @@
 # Maps the X, Y, Z chaotic coordinates to R, G, B LED brightness.
 
 import utime
-import math
-from machine import Pin, PWM
+import led_rgb
 
 # --- LED Configuration ---
 # UPDATE THESE PINS to match your specific wiring!
@@ -12,15 +11,9 @@ PIN_RED = 16
 PIN_GREEN = 17
 PIN_BLUE = 18
 
-# Initialize PWM
-pwm_r = PWM(Pin(PIN_RED))
-pwm_g = PWM(Pin(PIN_GREEN))
-pwm_b = PWM(Pin(PIN_BLUE))
-
-# Set PWM frequency (1kHz is usually good for LEDs)
-pwm_r.freq(1000)
-pwm_g.freq(1000)
-pwm_b.freq(1000)
+# Initialize PWM (1kHz is usually good for LEDs). The setter takes raw
+# 16-bit duties; the Lorenz mapping already clamps, so no checks are redone.
+_set_u16 = led_rgb.init_u16((PIN_RED, PIN_GREEN, PIN_BLUE), freq=1000)
 
 # --- Lorenz System Constants ---
 # These are the standard constants used in the Lorenz equations
@@ -28,22 +21,27 @@ SIGMA = 10.0
 RHO = 28.0
 BETA = 8.0 / 3.0
 
-# Time step (delta t) - controls the speed of the simulation
-DT = 0.015 
+# Time step (delta t) - controls the speed of the simulation.
+# RK4 stays accurate at twice the old Euler step, so the loop runs half as
+# many steps (every FRAME_MS) for the same on-screen speed.
+DT = 0.03
+FRAME_MS = 20
 
-def map_value(value, min_val, max_val):
+def map_factors(min_val, max_val):
     """
-    Maps a value from the Lorenz range to the PWM range (0-65535).
-    Includes clamping to ensure we don't exceed limits.
+    Returns (scale, offset) so that value * scale + offset maps the Lorenz
+    range min_val..max_val onto the PWM range (0-65535).
     """
-    # Normalize to 0.0 - 1.0
-    normalized = (value - min_val) / (max_val - min_val)
-    if normalized < 0: normalized = 0
-    if normalized > 1: normalized = 1
-    
-    # Convert to 16-bit integer
-    duty = int(normalized * 65535)
-    return duty
+    scale = 65535 / (max_val - min_val)
+    return scale, -min_val * scale
+
+# The Lorenz attractor typically stays within these bounds:
+# x: [-20, 20], y: [-30, 30], z: [0, 50]
+# We map them creatively to RGB to get good color mixing.
+# You can tweak the min/max values to change the color palette focus.
+R_SCALE, R_OFFSET = map_factors(-20, 20)
+G_SCALE, G_OFFSET = map_factors(-25, 25)
+B_SCALE, B_OFFSET = map_factors(5, 45)
 
 def set_rgb(r, g, b):
     """
@@ -51,9 +49,7 @@ def set_rgb(r, g, b):
     HANDLES COMMON ANODE INVERSION HERE.
     If your LED is Common Cathode, remove the '65535 -' part.
     """
-    pwm_r.duty_u16(65535 - r)
-    pwm_g.duty_u16(65535 - g)
-    pwm_b.duty_u16(65535 - b)
+    _set_u16(65535 - r, 65535 - g, 65535 - b)
 
 def run_lorenz_loop(joy_x_pin):
     """
@@ -69,32 +65,73 @@ def run_lorenz_loop(joy_x_pin):
     # Exit threshold (Joystick Left)
     JOY_EXIT_THRESHOLD = 22000 
 
+    # Constants as locals for the hot loop
+    sigma = SIGMA
+    rho = RHO
+    beta = BETA
+    h = DT
+    h2 = DT / 2
+    h6 = DT / 6
+    # Mapping factors with the common-anode inversion folded in:
+    # 65535 - (v * scale + offset) == v * -scale + (65535 - offset)
+    rs = -R_SCALE
+    ro = 65535 - R_OFFSET
+    gs = -G_SCALE
+    go = 65535 - G_OFFSET
+    bs = -B_SCALE
+    bo = 65535 - B_OFFSET
+    write = _set_u16
+    pace = led_rgb.pace
+    next_tick = utime.ticks_add(utime.ticks_ms(), FRAME_MS)
+
     while True:
-        # --- 1. Calculate the Lorenz System (Euler Method) ---
+        # --- 1. Calculate the Lorenz System (Classical RK4) ---
         # dx/dt = sigma * (y - x)
         # dy/dt = x * (rho - z) - y
         # dz/dt = x * y - beta * z
+        # The four derivative evaluations are inlined (no tuples per step).
         
-        dx = (SIGMA * (y - x)) * DT
-        dy = (x * (RHO - z) - y) * DT
-        dz = (x * y - BETA * z) * DT
+        k1x = sigma * (y - x)
+        k1y = x * (rho - z) - y
+        k1z = x * y - beta * z
         
-        x = x + dx
-        y = y + dy
-        z = z + dz
+        tx = x + h2 * k1x
+        ty = y + h2 * k1y
+        tz = z + h2 * k1z
+        k2x = sigma * (ty - tx)
+        k2y = tx * (rho - tz) - ty
+        k2z = tx * ty - beta * tz
         
-        # --- 2. Map Coordinates to Colors ---
-        # The Lorenz attractor typically stays within these bounds:
-        # x: [-20, 20], y: [-30, 30], z: [0, 50]
+        tx = x + h2 * k2x
+        ty = y + h2 * k2y
+        tz = z + h2 * k2z
+        k3x = sigma * (ty - tx)
+        k3y = tx * (rho - tz) - ty
+        k3z = tx * ty - beta * tz
+        
+        tx = x + h * k3x
+        ty = y + h * k3y
+        tz = z + h * k3z
+        k4x = sigma * (ty - tx)
+        k4y = tx * (rho - tz) - ty
+        k4z = tx * ty - beta * tz
         
-        # We map them creatively to RGB to get good color mixing.
-        # You can tweak the min/max values to change the color palette focus.
-        r_val = map_value(x, -20, 20)
-        g_val = map_value(y, -25, 25)
-        b_val = map_value(z, 5, 45)
+        x = x + h6 * (k1x + 2 * (k2x + k3x) + k4x)
+        y = y + h6 * (k1y + 2 * (k2y + k3y) + k4y)
+        z = z + h6 * (k1z + 2 * (k2z + k3z) + k4z)
+        
+        # --- 2. Map Coordinates to Colors ---
+        # (ranges are set by the *_SCALE / *_OFFSET factors above)
+        # One multiply-add per channel, clamped to 0-65535 inline
+        r_val = int(x * rs + ro)
+        r_val = 0 if r_val < 0 else 65535 if r_val > 65535 else r_val
+        g_val = int(y * gs + go)
+        g_val = 0 if g_val < 0 else 65535 if g_val > 65535 else g_val
+        b_val = int(z * bs + bo)
+        b_val = 0 if b_val < 0 else 65535 if b_val > 65535 else b_val
         
-        # Update LED
-        set_rgb(r_val, g_val, b_val)
+        # Update LED (already inverted for the common anode)
+        write(r_val, g_val, b_val)
 
         # --- 3. Check Exit Condition ---
         # Check if joystick is pushed left to go back
@@ -104,5 +141,6 @@ def run_lorenz_loop(joy_x_pin):
             return
 
         # --- 4. Speed Control ---
-        # A short sleep keeps the math running smoothly without being too jittery
-        utime.sleep_ms(10)
+        # Sleep until the next frame deadline, so the step rate stays at one per
+        # FRAME_MS however long the math above took
+        next_tick = pace(next_tick, FRAME_MS)
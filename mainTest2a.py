@@ -1,7 +1,11 @@
 # The central controller for all applications on the Pico build.
-# ...
+# Expects clock_app, weather_app and lights_app on the board: the first two
+# are clock_app2.py / weather_app2.py here; lights_app is not in this repo.
+#
+# Startup imports every effect module; see the README for precompiling them.
 
-from machine import Pin, I2C, ADC
+from machine import Pin, I2C, ADC, Timer
+from array import array
 import utime
 import gc
 
@@ -16,27 +20,100 @@ import clock_app
 import lights_app
 import weather_app # Make sure this is imported
 
-# ... (Hardware Configuration remains the same) ...
+# --- Hardware Configuration ---
+I2C_SDA_PIN = 0
+I2C_SCL_PIN = 1
+I2C_ADDR = 0x27 # Check your LCD's I2C address, 0x27 is a common one
+NUM_LINES = 2
+NUM_COLS = 16
+
+JOYSTICK_X_PIN = 26
+JOYSTICK_Y_PIN = 27
+JOY_DEAD_ZONE = 20000 # Distance from center (32768) that counts as a move
+DEBOUNCE_DELAY_MS = 200 # Time in milliseconds to debounce input
 
 # --- Global Variables ---
 menu_items = ["Clock", "Weather", "Lights", "Settings"]
-# ... (rest of the globals are fine) ...
+current_menu_index = 0
+last_move_time = utime.ticks_ms()
 
 # --- Hardware Initialization ---
-# ... (All hardware init remains the same) ...
+i2c = I2C(0, sda=Pin(I2C_SDA_PIN), scl=Pin(I2C_SCL_PIN), freq=400000)
+joy_x = ADC(Pin(JOYSTICK_X_PIN))
+joy_y = ADC(Pin(JOYSTICK_Y_PIN))
+
+# --- Joystick Sampling ---
+# A timer samples the joystick at INPUT_HZ into a small ring buffer, so the
+# menu loop only wakes to drain it instead of polling the ADC itself
+INPUT_HZ = 50
+INPUT_SLOTS = 8 # Power of two; new samples are dropped while it is full
+GC_MIN_FREE = 4096 # Collect only when the free heap drops below this
+
+# Single-producer/single-consumer ring: only the timer callback writes
+# _input_head and only _pop_input writes _input_tail, so neither side can
+# clobber the other's index. One slot stays empty to tell full from empty.
+_input_buf = array('H', bytes(4 * INPUT_SLOTS)) # x, y pairs
+_input_head = 0
+_input_tail = 0
+_input_timer = Timer()
+
+def _push_input(x, y):
+    """Timer side: stores one (x, y) joystick sample, or drops it if full."""
+    global _input_head
+    i = _input_head
+    nxt = (i + 1) & (INPUT_SLOTS - 1)
+    if nxt == _input_tail:
+        return
+    _input_buf[2 * i] = x
+    _input_buf[2 * i + 1] = y
+    _input_head = nxt # Publish only after the slot is written
+
+def _pop_input():
+    """Returns the oldest buffered (x, y) sample, or None if there is none."""
+    global _input_tail
+    i = _input_tail
+    if i == _input_head:
+        return None
+    sample = _input_buf[2 * i], _input_buf[2 * i + 1]
+    _input_tail = (i + 1) & (INPUT_SLOTS - 1) # Release the slot after reading
+    return sample
+
+def start_input(joy_x, joy_y):
+    """Starts sampling the joystick ADCs (stop it with _input_timer.deinit())."""
+    global _input_head, _input_tail
+    _input_timer.deinit()
+    _input_head = _input_tail = 0
+    def sample(t, _x=joy_x.read_u16, _y=joy_y.read_u16):
+        _push_input(_x(), _y())
+    _input_timer.init(freq=INPUT_HZ, mode=Timer.PERIODIC, callback=sample)
 
 # --- Functions ---
 
 # We can remove the old startup_script() function.
 
 def get_lcd_object():
-    # ... (This function remains the same) ...
+    """Returns the LCD on the I2C bus, or None if nothing answers at I2C_ADDR."""
+    if I2C_ADDR not in i2c.scan():
+        return None
+    return I2cLcd(i2c, I2C_ADDR, NUM_LINES, NUM_COLS)
 
 def update_menu_display(lcd, menu_items, current_index):
-    # ... (This function remains the same) ...
-    
+    """Shows the previous item on the top line and the selection below it."""
+    if not lcd:
+        print(f"> {menu_items[current_index]}")
+        return
+    prev_index = (current_index - 1) % len(menu_items)
+    lcd.clear()
+    lcd.move_to(0, 0)
+    lcd.putstr(f"  {menu_items[prev_index]}")
+    lcd.move_to(0, 1)
+    lcd.putstr(f"> {menu_items[current_index]}")
+
 def execute_action(lcd, wlan, menu_item, joy_x, joy_y):
     """Executes the action for the selected menu item."""
+    # The apps read the joystick themselves; pause the sampler meanwhile
+    _input_timer.deinit()
+
     if menu_item == "Clock":
         print("Launching Clock App...")
         lcd.clear()
@@ -67,6 +144,7 @@ def execute_action(lcd, wlan, menu_item, joy_x, joy_y):
     global current_menu_index
     current_menu_index = 0
     update_menu_display(lcd, menu_items, current_menu_index)
+    start_input(joy_x, joy_y)
     
 def main_loop():
     """The main application loop for menu navigation and app launching."""
@@ -84,23 +162,37 @@ def main_loop():
 
     # Initial display of the menu
     update_menu_display(lcd, menu_items, current_menu_index)
+    start_input(joy_x, joy_y)
 
     while True:
-        joy_x_val = joy_x.read_u16()
-        joy_y_val = joy_y.read_u16()
+        sample = _pop_input()
+        if sample is None:
+            # Nothing new: collect garbage only when the heap runs low,
+            # then wait about one sample period
+            if gc.mem_free() < GC_MIN_FREE:
+                gc.collect()
+            utime.sleep_ms(1000 // INPUT_HZ)
+            continue
+
+        joy_x_val, joy_y_val = sample
         current_time = utime.ticks_ms()
 
         if utime.ticks_diff(current_time, last_move_time) > DEBOUNCE_DELAY_MS:
-            # ... (Y-axis navigation logic remains the same) ...
-                
+            # Y-axis for moving through the menu, with wrap-around
+            if joy_y_val < 32768 - JOY_DEAD_ZONE:
+                current_menu_index = (current_menu_index - 1) % len(menu_items)
+                update_menu_display(lcd, menu_items, current_menu_index)
+                last_move_time = current_time
+            elif joy_y_val > 32768 + JOY_DEAD_ZONE:
+                current_menu_index = (current_menu_index + 1) % len(menu_items)
+                update_menu_display(lcd, menu_items, current_menu_index)
+                last_move_time = current_time
+
             # X-axis for selecting/entering an app
             if joy_x_val > 32768 + JOY_DEAD_ZONE:
                 # Pass the wlan object to the action function
                 execute_action(lcd, wlan, menu_items[current_menu_index], joy_x, joy_y)
                 last_move_time = current_time
 
-        utime.sleep_ms(10)
-        gc.collect()
-
 # Run the main loop
 main_loop()
@@ -1,6 +1,7 @@
 import os
-import moviepy.editor as mp
-from PIL import Image # Used for basic image handling if needed, though moviepy can resize
+import subprocess
+import tempfile
+from PIL import Image # Normalizes every photo to one size and format for ffmpeg
 
 def create_photo_montage(
     image_folder: str,
@@ -45,48 +46,60 @@ def create_photo_montage(
     print(f"Each photo will be displayed for {photo_duration_seconds} seconds.")
     print(f"Output video resolution: {output_resolution[0]}x{output_resolution[1]} at {output_fps} FPS.")
 
-    clips = []
-    for img_path in image_files:
-        try:
-            # Create an ImageClip from the image file
-            # moviepy's ImageClip can handle resizing directly
-            clip = mp.ImageClip(img_path, duration=photo_duration_seconds)
-
-            # Resize the clip to the desired output resolution.
-            # 'resize' method can take a tuple (width, height).
-            # If aspect ratios differ, it will stretch. For more advanced fitting
-            # (e.g., fit with black bars or crop to fill), you'd need more logic here
-            # or pre-process images with PIL.
-            clip = clip.resize(newsize=output_resolution)
-
-            clips.append(clip)
-            print(f"Added {os.path.basename(img_path)} to montage.")
-        except Exception as e:
-            print(f"Warning: Could not process image {os.path.basename(img_path)}: {e}")
-
-    if not clips:
-        print("No valid image clips could be created. Montage not generated.")
-        return
-
-    # Concatenate all image clips into a single video clip
-    final_clip = mp.concatenate_videoclips(clips)
-
-    print(f"Writing video to '{output_filename}'...")
-    try:
-        # Write the final video file
-        # codec='libx264' is a common and efficient codec for MP4
-        final_clip.write_videofile(
+    with tempfile.TemporaryDirectory() as work_dir:
+        # ffmpeg's concat demuxer needs every input to share one codec and one
+        # set of stream parameters, so each photo (any format, with or without
+        # alpha) is converted once to an RGB PNG at the output size. Photos PIL
+        # can't read are skipped instead of aborting the encode.
+        # If aspect ratios differ, the resize will stretch. For more advanced fitting
+        # (e.g., fit with black bars or crop to fill), you'd need more logic here.
+        frame_files = []
+        for img_path in image_files:
+            try:
+                with Image.open(img_path) as img:
+                    frame = img.convert('RGB').resize(output_resolution, Image.LANCZOS)
+                frame_path = os.path.join(work_dir, f"frame_{len(frame_files):05d}.png")
+                frame.save(frame_path, compress_level=1) # Temporary; favor speed over size
+                frame_files.append(frame_path)
+                print(f"Added {os.path.basename(img_path)} to montage.")
+            except Exception as e:
+                print(f"Warning: Could not process image {os.path.basename(img_path)}: {e}")
+
+        if not frame_files:
+            print("No valid image clips could be created. Montage not generated.")
+            return
+
+        # The demuxer shows each file for its 'duration'; the last file is
+        # listed twice because the final duration is otherwise ignored.
+        def concat_entry(path):
+            return "file '" + path.replace("'", "'\\''") + "'\n"
+
+        list_path = os.path.join(work_dir, "frames.txt")
+        with open(list_path, 'w') as fp:
+            for frame_path in frame_files:
+                fp.write(concat_entry(frame_path))
+                fp.write(f"duration {photo_duration_seconds}\n")
+            fp.write(concat_entry(frame_files[-1]))
+
+        command = [
+            'ffmpeg', '-y',
+            '-f', 'concat', '-safe', '0', '-i', list_path,
+            '-vf', f'fps={output_fps}',
+            '-c:v', 'libx264', # A common and efficient codec for MP4
+            '-preset', 'veryfast',
+            '-tune', 'stillimage',
+            '-pix_fmt', 'yuv420p', # Plays everywhere
             output_filename,
-            fps=output_fps,
-            codec='libx264',
-            audio_codec='aac' # Include audio codec even if no audio, for compatibility
-        )
-        print(f"Montage successfully created: '{output_filename}'")
-    except Exception as e:
-        print(f"Error writing video file: {e}")
-        print("Please ensure FFmpeg is installed and accessible in your system's PATH.")
-        print("You can download FFmpeg from: https://ffmpeg.org/download.html")
+        ]
 
+        print(f"Writing video to '{output_filename}'...")
+        try:
+            subprocess.run(command, check=True)
+            print(f"Montage successfully created: '{output_filename}'")
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Error writing video file: {e}")
+            print("Please ensure FFmpeg is installed and accessible in your system's PATH.")
+            print("You can download FFmpeg from: https://ffmpeg.org/download.html")
 
 if __name__ == "__main__":
     # --- Configuration ---
@@ -5,8 +5,12 @@
 import utime
 import math
 import random
-from machine import Pin, PWM, I2C, ADC
+import micropython
+from array import array
+from machine import Pin, I2C, ADC
 import gc
+import led_rgb
+from oklab_rgb import GAMMA_LUT, GAMMA_SIZE
 
 # It's good practice to handle potential import errors for the LCD
 try:
@@ -23,26 +27,49 @@ except ImportError:
 PIN_R, PIN_G, PIN_B = 16, 17, 18
 DEBOUNCE_DELAY_MS = 250
 PWM_FREQ = 1000
+HUE_STEP = 0.05 # Hue time advanced per tick (10 ms)
+CHROMA_RATE = 0.2 # Chroma oscillates at this fraction of the hue time
 
 # --- COLOR MODEL CONVERSIONS ---
-# These functions handle the math to convert between RGB and the Oklab color space.
-def xyz_to_rgb(x, y, z):
-    r = +3.2406 * x - 1.5372 * y - 0.4986 * z
-    g = -0.9689 * x + 1.8758 * y + 0.0415 * z
-    b = +0.0557 * x - 0.2040 * y + 1.0570 * z
-    r = 1.055 * (r ** (1/2.4)) - 0.055 if r > 0.0031308 else 12.92 * r
-    g = 1.055 * (g ** (1/2.4)) - 0.055 if g > 0.0031308 else 12.92 * g
-    b = 1.055 * (b ** (1/2.4)) - 0.055 if b > 0.0031308 else 12.92 * b
-    return int(r * 255), int(g * 255), int(b * 255)
-
-def oklab_to_xyz(L, a, b):
-    l = (L + 0.3963377774 * a + 0.2158037573 * b) ** 3
-    m = (L - 0.1055613458 * a - 0.0638541728 * b) ** 3
-    s = (L - 0.0894841775 * a - 1.2914855480 * b) ** 3
-    x = +4.0767416621 * l - 3.3077115913 * m + 0.2309699292 * s
-    y = -1.2684380046 * l + 2.6097574011 * m - 0.3413193965 * s
-    z = -0.0041960863 * l - 0.7034186147 * m + 1.7076147010 * s
-    return x / 100, y / 100, z / 100
+# The Oklab -> RGB math is inlined in LandscapeTraversal._tick, which is
+# compiled with the native emitter (it can't optimize across calls).
+# The LMS -> XYZ and XYZ -> sRGB matrices are applied back to back, so they
+# are pre-multiplied into one 3x3 (XYZ_TO_RGB @ LMS_TO_XYZ) written inline.
+
+# The sRGB gamma is the shared oklab_rgb table, so the tick needs no pow()
+# per channel.
+
+# --- RANDOM POOL ---
+# Terrain and mode parameters draw from a small pool of random() values kept
+# in an array('f'); it is refilled in place each time it runs out.
+RPOOL_SIZE = 32 # Power of two
+_rpool = array('f', bytes(4 * RPOOL_SIZE))
+_rpool_i = 0
+
+def _refill_rpool():
+    rnd = random.random
+    for i in range(RPOOL_SIZE):
+        _rpool[i] = rnd()
+
+def _rand_float(lo, hi):
+    """ Uniform float in [lo, hi) from the pool. """
+    global _rpool_i
+    v = _rpool[_rpool_i]
+    _rpool_i = (_rpool_i + 1) & (RPOOL_SIZE - 1)
+    if _rpool_i == 0:
+        _refill_rpool()
+    return lo + (hi - lo) * v
+
+def _rand_int(lo, hi):
+    """ Uniform int in [lo, hi] (inclusive, like randint) from the pool. """
+    v = int(_rand_float(lo, hi + 1))
+    return hi if v > hi else v
+
+_refill_rpool()
+
+# Sine half-wave (0 -> 1 -> 0) over progress 0..1, sampled at 256 points;
+# get_elevation interpolates it instead of calling math.sin each tick
+_SIN_HALFWAVE = array('f', [math.sin(i / 255 * math.pi) for i in range(256)])
 
 class TerrainObject:
     """ Represents a single, dynamic elevation feature like a hill or peak. """
@@ -50,8 +77,8 @@ class TerrainObject:
         self.base_L = base_L
         
         # Randomize the specific properties of this terrain feature
-        self.height = random.uniform(*height_range)
-        self.width_ticks = random.randint(*width_range_ticks)
+        self.height = _rand_float(*height_range)
+        self.width_ticks = _rand_int(*width_range_ticks)
         
         # Internal state
         self.current_tick = 0
@@ -70,8 +97,12 @@ class TerrainObject:
         """ Calculates the current L value based on progress across the terrain. """
         # We use a sine half-wave for a smooth hill shape.
         # This makes it rise from 0 to peak and back to 0 over the duration.
-        elevation_offset = self.height * math.sin(self.progress * math.pi)
-        return self.base_L + elevation_offset
+        # (progress < 1, so i + 1 stays inside the table)
+        f = self.progress * 255
+        i = int(f)
+        s = _SIN_HALFWAVE[i]
+        s += (_SIN_HALFWAVE[i + 1] - s) * (f - i)
+        return self.base_L + self.height * s
 
 class LandscapeTraversal:
     """ Manages the state and logic for traversing dynamic Oklab landscapes. """
@@ -79,14 +110,17 @@ class LandscapeTraversal:
         self.joy_x_pin = joy_x_pin
         self.lcd = lcd
         self.last_exit_time = 0
+        # What the LCD rows currently show, so unchanged rows aren't resent
+        self._last_status = None
+        self._last_bar_len = -1
         
         # --- LED Setup ---
-        self.led_r = PWM(Pin(PIN_R)); self.led_r.freq(PWM_FREQ)
-        self.led_g = PWM(Pin(PIN_G)); self.led_g.freq(PWM_FREQ)
-        self.led_b = PWM(Pin(PIN_B)); self.led_b.freq(PWM_FREQ)
+        # set_rgb(r, g, b) for a common anode LED: the inversion and the exact
+        # 0-255 -> 16-bit duty scaling (x * 257) are baked into led_rgb's table
+        self.set_rgb = led_rgb.init((PIN_R, PIN_G, PIN_B), common_anode=True, freq=PWM_FREQ)
 
         # --- State Management ---
-        self.hue_time = 0.0  # Separate timer for hue/chroma evolution
+        # Hue/chroma evolve on their own oscillators, reset in _setup_new_mode
         self.current_mode = 0
         
         # --- Terrain Management ---
@@ -94,40 +128,71 @@ class LandscapeTraversal:
         self.time_until_next_terrain = 0 # Countdown in ticks
         
         # --- MODE CONFIGURATION ---
-        # Defines the rules for generating terrain in each region.
-        self.LANDSCAPE_MODES = [
-            {
-                "name": "PLAINS",
-                "base_L": 0.6,
-                "terrain_height": (0.05, 0.1),  # Small, gentle hills
-                "terrain_width": (150, 400), # Ticks (1.5 to 4 seconds)
-                "wait_time": (300, 800)      # Long waits between hills
-            },
-            {
-                "name": "PIEDMONT",
-                "base_L": 0.4,
-                "terrain_height": (0.15, 0.3), # Medium, rolling hills
-                "terrain_width": (200, 500),
-                "wait_time": (50, 200)       # Shorter waits, more frequent hills
-            },
-            {
-                "name": "MOUNTAINS",
-                "base_L": 0.3, # Valleys are still bright
-                "terrain_height": (0.4, 0.6),  # High peaks
-                "terrain_width": (400, 800), # Wide mountains
-                "wait_time": (0, 50)         # Almost no waiting, continuous peaks
-            },
-        ]
+        # Defines the rules for generating terrain in each region, as
+        # (base_L, terrain_height, terrain_width, wait_time, name).
+        # The active mode's fields are unpacked onto self in _setup_new_mode.
+        self.LANDSCAPE_MODES = (
+            (0.6,            # base_L
+             (0.05, 0.1),    # terrain_height: Small, gentle hills
+             (150, 400),     # terrain_width: Ticks (1.5 to 4 seconds)
+             (300, 800),     # wait_time: Long waits between hills
+             "PLAINS"),
+            (0.4,
+             (0.15, 0.3),    # Medium, rolling hills
+             (200, 500),
+             (50, 200),      # Shorter waits, more frequent hills
+             "PIEDMONT"),
+            (0.3,            # Valleys are still bright
+             (0.4, 0.6),     # High peaks
+             (400, 800),     # Wide mountains
+             (0, 50),        # Almost no waiting, continuous peaks
+             "MOUNTAINS"),
+        )
         self._setup_new_mode()
 
-    def set_rgb(self, r, g, b):
-        """ Sets the color of a common anode RGB LED by inverting values. """
-        duty_r = int((255 - max(0, min(255, int(r)))) / 255 * 65535)
-        duty_g = int((255 - max(0, min(255, int(g)))) / 255 * 65535)
-        duty_b = int((255 - max(0, min(255, int(b)))) / 255 * 65535)
-        self.led_r.duty_u16(duty_r)
-        self.led_g.duty_u16(duty_g)
-        self.led_b.duty_u16(duty_b)
+    @micropython.native
+    def _tick(self, L):
+        """ Advances the hue/chroma walk one tick and returns the (r, g, b) for lightness L. """
+        # --- HUE/CHROMA (a, b) LOGIC (Completely Independent) ---
+        # Both angles advance by a fixed step, so their (cos, sin) pairs are
+        # rotated by precomputed step rotations instead of calling sin/cos
+        c = self._hue_c
+        sn = self._hue_s
+        cs = self._chroma_s
+        R = 0.15 + 0.05 * cs # Slowly evolving chroma
+        a = R * c
+        b = R * sn
+
+        # Always advance hue time
+        cd = self._hue_cd
+        sd = self._hue_sd
+        self._hue_c = c * cd - sn * sd
+        self._hue_s = sn * cd + c * sd
+        cc = self._chroma_c
+        cd = self._chroma_cd
+        sd = self._chroma_sd
+        self._chroma_c = cc * cd - cs * sd
+        self._chroma_s = cs * cd + cc * sd
+
+        # --- Oklab -> LMS (cubes as multiplies, not the generic ** operator) ---
+        l = L + 0.3963377774 * a + 0.2158037573 * b
+        m = L - 0.1055613458 * a - 0.0638541728 * b
+        s = L - 0.0894841775 * a - 1.2914855480 * b
+        l = l * l * l
+        m = m * m * m
+        s = s * s * s
+
+        # --- LMS -> XYZ -> linear sRGB, as one fused matrix ---
+        r = +15.1630240995 * l - 14.3799647384 * m + 0.4217406389 * s
+        g = -6.3294651430 * l + 8.0710328213 * m - 0.7931676783 * s
+        b = +0.4814006003 * l - 1.4601435212 * m + 1.8874429209 * s
+        # --- Gamma via the table (out-of-gamut values clamp to 0 / 255) ---
+        lut = GAMMA_LUT
+        n = GAMMA_SIZE
+        r = 0 if r <= 0.0 else 255 if r >= 1.0 else lut[int(r * n + 0.5)]
+        g = 0 if g <= 0.0 else 255 if g >= 1.0 else lut[int(g * n + 0.5)]
+        b = 0 if b <= 0.0 else 255 if b >= 1.0 else lut[int(b * n + 0.5)]
+        return r, g, b
 
     def check_exit(self):
         """ Checks for a joystick left movement to exit. """
@@ -140,56 +205,87 @@ class LandscapeTraversal:
 
     def _get_random_wait_time(self):
         """ Gets a random wait time based on the current mode's rules. """
-        wait_range = self.LANDSCAPE_MODES[self.current_mode]["wait_time"]
-        return random.randint(*wait_range)
+        return _rand_int(*self._wait_range)
 
     def _create_new_terrain(self):
         """ Creates a new TerrainObject based on the current mode's rules. """
-        mode_rules = self.LANDSCAPE_MODES[self.current_mode]
         self.current_terrain = TerrainObject(
-            base_L=mode_rules["base_L"],
-            height_range=mode_rules["terrain_height"],
-            width_range_ticks=mode_rules["terrain_width"]
+            base_L=self._base_L,
+            height_range=self._h_range,
+            width_range_ticks=self._w_range
         )
         self.update_display() # Update the display to show we've encountered a feature
 
     def _setup_new_mode(self):
         """ Resets timers and randomizes parameters for the new mode. """
-        self.hue_time = 0.0
+        (self._base_L, self._h_range, self._w_range,
+         self._wait_range, self._name) = self.LANDSCAPE_MODES[self.current_mode]
         self.current_terrain = None
         self.time_until_next_terrain = self._get_random_wait_time()
         # Randomize hue parameters separately
-        self.initial_hue_offset = random.uniform(0.0, 2 * math.pi)
-        self.hue_speed = random.uniform(0.8, 1.2)
+        self.initial_hue_offset = _rand_float(0.0, 2 * math.pi)
+        self.hue_speed = _rand_float(0.8, 1.2)
+        # Oscillator state at hue time 0, and the rotation for one tick
+        self._hue_c = math.cos(self.initial_hue_offset)
+        self._hue_s = math.sin(self.initial_hue_offset)
+        self._hue_cd = math.cos(HUE_STEP * self.hue_speed)
+        self._hue_sd = math.sin(HUE_STEP * self.hue_speed)
+        self._chroma_c = 1.0
+        self._chroma_s = 0.0
+        self._chroma_cd = math.cos(HUE_STEP * CHROMA_RATE)
+        self._chroma_sd = math.sin(HUE_STEP * CHROMA_RATE)
         # Total time in a mode before switching
-        self.mode_duration_ticks = random.randint(2000, 3000) # 20-30 seconds
+        self.mode_duration_ticks = _rand_int(2000, 3000) # 20-30 seconds
         self.mode_progress_ticks = 0
         self.update_display()
+        # A mode change already redraws the LCD, so a collection pause here
+        # (once per 20-30 s) is not noticeable
+        gc.collect()
         
     def update_display(self):
         """ Updates the LCD with the current mode status. """
         if not self.lcd: return
-        mode = self.LANDSCAPE_MODES[self.current_mode]
-        self.lcd.clear()
         
-        status = mode['name']
+        status = self._name
         if self.current_terrain:
             status += ": Peak" # We are on a feature
         else:
             status += ": Valley" # We are on flat ground
         
-        self.lcd.putstr(status)
-        self.lcd.move_to(0, 1)
-        
-        # Show mode progress
+        # Show mode progress ("[" + 14 cells + "]" fills the 16 columns)
         progress = self.mode_progress_ticks / self.mode_duration_ticks
-        bar_len = int(progress * 16)
-        self.lcd.putstr("[" + "#" * bar_len + "-" * (15 - bar_len) + "]")
+        bar_len = int(progress * 14)
+        
+        if status == self._last_status and bar_len == self._last_bar_len:
+            return # Nothing visible changed; skip the I2C traffic
+        
+        if self._last_status is None:
+            self.lcd.clear() # First draw: wipe whatever was shown before
+        # Rows are overwritten in place (padded to 16 columns) rather than
+        # cleared, which avoids the slow HD44780 clear command
+        if status != self._last_status:
+            self.lcd.move_to(0, 0)
+            self.lcd.putstr("{:<16}".format(status)[:16])
+            self._last_status = status
+        if bar_len != self._last_bar_len:
+            self.lcd.move_to(0, 1)
+            self.lcd.putstr("[" + "#" * bar_len + "-" * (14 - bar_len) + "]")
+            self._last_bar_len = bar_len
 
     def run(self):
         """ The main loop for the dynamic landscape traversal. """
         self.set_rgb(0, 0, 0)
         utime.sleep(1)
+        # Per-tick callables as locals, so the loop skips the global and
+        # attribute lookups (sin/cos are no longer called per tick at all)
+        tick = self._tick
+        set_rgb = self.set_rgb
+        check_exit = self.check_exit
+        sleep_ms = utime.sleep_ms
+        # The tick allocates little, so collect only after a quarter of the
+        # free heap has been used instead of on every tick
+        old_threshold = gc.threshold()
+        gc.threshold(gc.mem_free() // 4)
 
         try:
             while True:
@@ -204,24 +300,16 @@ class LandscapeTraversal:
                         self.update_display()
                 else:
                     # We are on "flat ground" between features
-                    L = self.LANDSCAPE_MODES[self.current_mode]["base_L"]
+                    L = self._base_L
                     self.time_until_next_terrain -= 1
                     if self.time_until_next_terrain <= 0:
                         self._create_new_terrain()
                 
-                L = max(0.0, min(1.0, L)) # Clamp L to valid range
-
-                # --- HUE/CHROMA (a, b) LOGIC (Completely Independent) ---
-                R = 0.15 + 0.05 * math.sin(self.hue_time * 0.2) # Slowly evolving chroma
-                effective_hue_time = self.hue_time * self.hue_speed
-                a = R * math.cos(effective_hue_time + self.initial_hue_offset)
-                b = R * math.sin(effective_hue_time + self.initial_hue_offset)
-                self.hue_time += 0.05 # Always advance hue time
+                L = 0.0 if L < 0.0 else 1.0 if L > 1.0 else L # Clamp L to valid range
 
-                # --- CONVERT AND SET COLOR ---
-                x, y, z = oklab_to_xyz(L, a, b)
-                r, g, b_ = xyz_to_rgb(x * 100, y * 100, z * 100)
-                self.set_rgb(r, g, b_)
+                # --- HUE/CHROMA, CONVERT AND SET COLOR ---
+                r, g, b = tick(L)
+                set_rgb(r, g, b)
 
                 # --- MODE CHANGE LOGIC ---
                 self.mode_progress_ticks += 1
@@ -230,15 +318,15 @@ class LandscapeTraversal:
                     self._setup_new_mode()
 
                 # --- EXIT & SLEEP ---
-                if self.check_exit():
-                    self.set_rgb(0, 0, 0)
+                if check_exit():
+                    set_rgb(0, 0, 0)
                     return
                 
-                utime.sleep_ms(10)
-                gc.collect()
+                sleep_ms(10)
 
         finally:
             self.set_rgb(0, 0, 0) # Ensure LED is off on exit
+            gc.threshold(old_threshold)
 
 
 # --- MAIN RUNNER FUNCTION ---
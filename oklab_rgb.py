@@ -0,0 +1,86 @@
+# oklab_rgb.py
+# Shared Oklab -> 8-bit sRGB conversion used by the Oklab effects.
+
+import utime
+
+# --- sRGB Gamma Table ---
+# Linear 0.0-1.0 -> 8-bit sRGB, sampled at 1024 points so oklab_to_rgb needs
+# no pow() per channel (within 2 levels of the exact curve)
+GAMMA_SIZE = 1024
+def _srgb_encode(c):
+    return (1.055 * c**(1.0/2.4) - 0.055) if c > 0.0031308 else c * 12.92
+GAMMA_LUT = bytes(int(_srgb_encode(i / GAMMA_SIZE) * 255 + 0.5) for i in range(GAMMA_SIZE + 1))
+
+def srgb8_from_linear(c):
+    """Linear light (clamped to 0-1) -> 8-bit sRGB via the gamma table."""
+    if c <= 0.0:
+        return 0
+    if c >= 1.0:
+        return 255
+    return GAMMA_LUT[int(c * GAMMA_SIZE + 0.5)]
+
+# --- Oklab to RGB Conversion ---
+def oklab_to_rgb(L, a, b):
+    """
+    Converts Oklab to 8-bit sRGB, returned as an (r, g, b) tuple.
+    """
+    # Step 1: Oklab to L'M'S' (cube roots of the cone responses)
+    l_prime = L + 0.3963377774 * a + 0.2158037573 * b
+    m_prime = L - 0.1055613423 * a - 0.0638541728 * b
+    s_prime = L - 0.0894841775 * a - 1.2914855480 * b
+
+    # Step 2: Invert the power function to get linear color components
+    # (cubes inlined: no nested def built per call, no pow)
+    l = l_prime * l_prime * l_prime if l_prime > 0.0 else 0.0
+    m = m_prime * m_prime * m_prime if m_prime > 0.0 else 0.0
+    s = s_prime * s_prime * s_prime if s_prime > 0.0 else 0.0
+
+    # Step 3: Convert L'M'S' to Linear RGB
+    r_linear = 4.0767416621 * l - 3.3077115913 * m + 0.2309699292 * s
+    g_linear = -1.2684380046 * l + 2.6097574011 * m - 0.3413193965 * s
+    b_linear = -0.0041960863 * l - 0.7034186147 * m + 1.7076147010 * s
+
+    # Step 4: Apply the sRGB gamma to get 8-bit values
+    return (srgb8_from_linear(r_linear),
+            srgb8_from_linear(g_linear),
+            srgb8_from_linear(b_linear))
+
+# --- Gradient Precomputation ---
+def precompute_gradient(start_oklab, end_oklab, steps):
+    """
+    Converts a straight Oklab path to RGB once, before it is played.
+    Returns bytearray(3 * (steps + 1)) of flat (r, g, b) values.
+    """
+    step_L = (end_oklab[0] - start_oklab[0]) / steps
+    step_a = (end_oklab[1] - start_oklab[1]) / steps
+    step_b = (end_oklab[2] - start_oklab[2]) / steps
+    buf = bytearray(3 * (steps + 1))
+    # Linearly interpolate in Oklab space by stepping the running point
+    L, a, b_ok = start_oklab
+    for j in range(0, len(buf), 3):
+        r, g, b = oklab_to_rgb(L, a, b_ok)
+        buf[j] = r
+        buf[j + 1] = g
+        buf[j + 2] = b
+        L += step_L
+        a += step_a
+        b_ok += step_b
+    return buf
+
+# --- Gradient Playback ---
+def play_gradient(buf, set_rgb, delay_ms):
+    """
+    Plays a precompute_gradient buffer, one color every delay_ms.
+    The LED is only written when the quantized color changes.
+    """
+    pr = pg = pb = -1
+    for j in range(0, len(buf), 3):
+        r = buf[j]
+        g = buf[j + 1]
+        b = buf[j + 2]
+        if r != pr or g != pg or b != pb:
+            set_rgb(r, g, b)
+            pr = r
+            pg = g
+            pb = b
+        utime.sleep_ms(delay_ms)